@@ -1,18 +1,19 @@
 import os
+import sys
+import gc
 import json
+import multiprocessing
 
 from classes.roo_document import RooDocument
+from classes.environment_variable import EnvironmentVariable
+from classes.reference_data import get_reference_data
+from classes.build_manifest import BuildManifest
+from classes.rule_cache import get_rule_cache, RuleCache
+from classes.export_formats import ExportFormats
+from classes.rule_store import RuleStore, publish_rule_store
+import classes.functions as func
 import classes.globals as g
 
-g.clear()
-file_list = []
-source_folder = os.path.join(os.getcwd(), "resources", "source")
-for file in os.listdir(source_folder):
-    if file.endswith("docx"):
-        if "$" not in file:
-            if "~" not in file:
-                file_list.append(file)
-
 # omissions = ["Albania PSR.docx", "Cameroon PSR.docx"]
 omissions = [
     "Australia PSR.docx",
@@ -33,18 +34,177 @@ included = [
 
 omissions += modern
 start_at = ""
-file_list.sort()
-index = 0
 max_files = 100
-for file in file_list:
-    # if file in included:
-    if file not in omissions:
-        if file >= start_at:
-            document = RooDocument(file)
-            index += 1
-            if index > max_files:
-                break
-
-filename = os.path.join(os.getcwd(), "resources", "temp", "multiple_chapter_rule_list.json")
-with open(filename, 'w') as f:
-    json.dump(g.multiple_chapter_rule_list, f, indent=4)
+
+
+def get_file_list():
+    """ Lists the Word documents in the source folder, ignoring Word's temporary lock files """
+    file_list = []
+    source_folder = os.path.join(os.getcwd(), "resources", "source")
+    for file in os.listdir(source_folder):
+        if file.endswith("docx"):
+            if "$" not in file:
+                if "~" not in file:
+                    file_list.append(file)
+    file_list.sort()
+    return file_list
+
+
+def select_files(file_list):
+    """ Applies the omissions, the start_at point and the max_files limit to the file list """
+    selected = []
+    for file in file_list:
+        # if file in included:
+        if file not in omissions:
+            if file >= start_at:
+                selected.append(file)
+                if len(selected) > max_files:
+                    break
+    return selected
+
+
+def get_worker_count():
+    """ The number of worker processes is taken from the batch_workers environment variable;
+    if it is omitted, documents are processed one after another in this process """
+    workers = EnvironmentVariable('batch_workers', 'int', permit_omission=True).value
+    if workers == "" or workers < 1:
+        workers = 1
+    if workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        print("- Worker processes need the fork start method, which this platform does not have, so documents will be processed one after another")
+        workers = 1
+    return workers
+
+
+def build_document(file):
+    """ Builds a single document and returns the multiple chapter rule entries it produced """
+    document = RooDocument(file)
+    return document.context.multiple_chapter_rule_list
+
+
+def try_build_document(file):
+    """ Errors that would normally stop execution are caught here, so that a failed document
+    is reported at the end of the run rather than ending the whole batch """
+    try:
+        return True, build_document(file)
+    except SystemExit:
+        return False, []
+    except Exception as e:
+        print("\nERROR: {file} failed with {error}\n".format(file=file, error=repr(e)))
+        return False, []
+
+
+def build_document_in_worker(file):
+    """ Worker processes must always hand a result back to the pool, and failures are reported
+    by the parent process. The rule cache statistics for the document are handed back too, so
+    that the parent can report them for the whole run """
+    stats_before = get_rule_cache().get_stats()
+    succeeded, rule_list = try_build_document(file)
+    stats_after = get_rule_cache().get_stats()
+    cache_stats = {key: stats_after[key] - stats_before[key] for key in stats_after}
+    return file, succeeded, rule_list, cache_stats
+
+
+def build_documents_in_sequence(files, manifest, inputs):
+    failures = []
+    for file in files:
+        succeeded, rule_list = try_build_document(file)
+        if succeeded:
+            manifest.record(file, inputs[file], rule_list)
+        else:
+            failures.append(file)
+    return get_rule_cache().get_stats(), failures
+
+
+def build_documents_in_parallel(files, workers, manifest, inputs):
+    print("Processing {count} documents across {workers} worker processes".format(count=len(files), workers=workers))
+    failures = []
+    cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    # Load the reference data before the workers are forked, so that they share the parent's
+    # copy of it. Freezing the collector stops garbage collection passes in the workers from
+    # touching, and therefore copying, the pages that hold it. The workers are always forked,
+    # whatever the platform's default start method: spawned workers would each load their own.
+    get_reference_data()
+    gc.freeze()
+
+    with multiprocessing.get_context("fork").Pool(processes=workers) as pool:
+        for file, succeeded, rule_list, document_cache_stats in pool.imap(build_document_in_worker, files, chunksize=1):
+            for key in cache_stats:
+                cache_stats[key] += document_cache_stats[key]
+            if succeeded:
+                manifest.record(file, inputs[file], rule_list)
+            else:
+                failures.append(file)
+    return cache_stats, failures
+
+
+def get_force_rebuild():
+    """ Setting force_rebuild ignores the build manifest and rebuilds every selected document """
+    force_rebuild = EnvironmentVariable('force_rebuild', 'int', permit_omission=True).value
+    return force_rebuild != "" and force_rebuild != 0
+
+
+def get_documents_to_build(files, manifest, inputs):
+    """ Only documents with an input that has changed since they were last built need rebuilding """
+    force_rebuild = get_force_rebuild()
+    files_to_build = []
+    for file in files:
+        if not force_rebuild and manifest.is_up_to_date(file, inputs[file]):
+            print("- {file} is up to date".format(file=file))
+        else:
+            files_to_build.append(file)
+    return files_to_build
+
+
+def write_multiple_chapter_rule_list(multiple_chapter_rule_list):
+    filename = os.path.join(os.getcwd(), "resources", "temp", "multiple_chapter_rule_list.json")
+    with open(filename, 'w') as f:
+        json.dump(multiple_chapter_rule_list, f, indent=4)
+
+
+def write_rule_store(files):
+    """ The rule store is built from the exports of every selected document, including those
+    that were up to date, so that it always covers all of them """
+    export_formats = ExportFormats.from_environment()
+    if "rule_store" not in export_formats.formats:
+        return
+    export_folder = os.path.join(os.getcwd(), "resources", "export")
+    ott_prototype_path = EnvironmentVariable('ott_prototype_path', 'string', permit_omission=True).value
+    export_filenames = [func.get_export_filename(file) for file in files]
+    rule_store = publish_rule_store(export_filenames, export_formats, export_folder, ott_prototype_path)
+    print(RuleStore.format_stats(rule_store.get_stats()))
+
+
+if __name__ == "__main__":
+    g.clear()
+    files = select_files(get_file_list())
+    manifest = BuildManifest()
+    inputs = {file: manifest.get_document_inputs(file) for file in files}
+    files_to_build = get_documents_to_build(files, manifest, inputs)
+
+    workers = min(get_worker_count(), max(len(files_to_build), 1))
+    if workers > 1:
+        cache_stats, failures = build_documents_in_parallel(files_to_build, workers, manifest, inputs)
+    else:
+        cache_stats, failures = build_documents_in_sequence(files_to_build, manifest, inputs)
+
+    # The documents that built have already been recorded in the manifest, and will be skipped
+    # by the next run, so the combined outputs are written for them even if others failed.
+    # Documents that were up to date contribute the entries recorded when they were last built
+    built_files = [file for file in files if file not in failures]
+    multiple_chapter_rule_list = []
+    for file in built_files:
+        multiple_chapter_rule_list += manifest.get_multiple_chapter_rule_list(file)
+    write_multiple_chapter_rule_list(multiple_chapter_rule_list)
+    write_rule_store(built_files)
+
+    print("\nBuilt {built} of {total} documents; {skipped} were up to date".format(
+        built=len(files_to_build) - len(failures),
+        total=len(files),
+        skipped=len(files) - len(files_to_build)
+    ))
+    print(RuleCache.format_stats(cache_stats))
+
+    if len(failures) > 0:
+        print("\nERROR: The following documents failed to process:\n\n- {failures}\n".format(failures="\n- ".join(failures)))
+        sys.exit(1)
@@ -0,0 +1,101 @@
+""" Benchmark for the bulk lookup.
+
+For each agreement in resources/export (or each binary index, with --binary), looks up a list
+of random commodity codes, half of them the min or max of one of the agreement's rule sets and
+half any code of 4 to 10 digits, then:
+
+- once code by code, with find_indexes and encode, as the HTTP server does
+- once in bulk, writing NDJSON as the bulk lookup does
+
+checks that both find the same rule sets for every code, and reports the time each takes.
+
+Run from the root of the repository, optionally naming the agreements:
+
+    python -m benchmarks.bulk_lookup
+    python -m benchmarks.bulk_lookup --codes 100000 albania japan
+    python -m benchmarks.bulk_lookup --binary
+"""
+import os
+import time
+import random
+import argparse
+
+from classes.rule_lookup import AgreementLookup, RuleLookup
+from classes.bulk_lookup import BulkLookup
+
+SEED = 0
+
+
+def get_codes(lookup, count):
+    generator = random.Random(SEED)
+    mins, maxes = lookup.get_bounds()
+    codes = []
+    for i in range(count):
+        if i % 2 == 0 and len(mins) > 0:
+            bounds = mins if generator.random() < 0.5 else maxes
+            code = "{code:010d}".format(code=bounds[generator.randrange(len(bounds))])
+        else:
+            code = "{code:010d}".format(code=generator.randrange(10 ** 10))
+        codes.append(code[0:generator.choice([4, 6, 8, 10])])
+    return codes
+
+
+def time_single(lookup, codes):
+    start = time.perf_counter()
+    results = {}
+    for code in codes:
+        normalized_code = RuleLookup.normalize_code(code)
+        results[normalized_code] = lookup.encode(lookup.find_indexes(normalized_code))
+    return results, time.perf_counter() - start
+
+
+def time_bulk(lookup, codes):
+    start = time.perf_counter()
+    bulk_lookup = BulkLookup(lookup)
+    size = sum(len(chunk) for chunk in bulk_lookup.iter_format(codes, "ndjson"))
+    elapsed = time.perf_counter() - start
+
+    results = {}
+    for code, normalized_code, indexes in bulk_lookup.join(codes):
+        results[normalized_code] = lookup.encode(indexes)
+    return results, elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--codes", type=int, default=100000)
+    parser.add_argument("--binary", action="store_true", help="load the binary indexes rather than the JSON exports")
+    parser.add_argument("--export-folder", default=os.path.join(os.getcwd(), "resources", "export"))
+    parser.add_argument("agreements", nargs="*")
+    arguments = parser.parse_args()
+
+    agreement_lookup = AgreementLookup(arguments.export_folder, arguments.agreements, binary=arguments.binary)
+    print("{agreement:<28}{single:>12}{bulk:>12}{size:>12}".format(agreement="", single="single ms", bulk="bulk ms", size="NDJSON MB"))
+    mismatches = []
+    total_single = 0
+    total_bulk = 0
+    for agreement in agreement_lookup.get_agreements():
+        lookup = agreement_lookup.get_lookup(agreement)
+        codes = get_codes(lookup, arguments.codes)
+        single_results, single_elapsed = time_single(lookup, codes)
+        bulk_results, bulk_elapsed, size = time_bulk(lookup, codes)
+        if single_results != bulk_results:
+            mismatches.append(agreement)
+        total_single += single_elapsed
+        total_bulk += bulk_elapsed
+        print("{agreement:<28}{single:>12.0f}{bulk:>12.0f}{size:>12.1f}".format(
+            agreement=agreement,
+            single=single_elapsed * 1000,
+            bulk=bulk_elapsed * 1000,
+            size=size / (1024 * 1024)
+        ))
+    print("{agreement:<28}{single:>12.0f}{bulk:>12.0f}".format(agreement="total", single=total_single * 1000, bulk=total_bulk * 1000))
+
+    if len(mismatches) > 0:
+        print("\nERROR: the bulk lookup differs from the single lookups for {agreements}".format(agreements=", ".join(mismatches)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+import os
+import glob
+import json
+
+from classes.build_context import BuildContext
+from classes.docx_table_reader import DocxTableReader
+from classes.corrections import Corrections
+import classes.functions as func
+
+
+def get_source_documents():
+    source_folder = os.path.join(os.getcwd(), "resources", "source")
+    return sorted(glob.glob(os.path.join(source_folder, "*.docx")))
+
+
+def read_table_rows(docx_filepath):
+    """ Reads the cell text of every table row in a document """
+    rows = []
+    for table in DocxTableReader(docx_filepath).tables:
+        rows += table
+    return rows
+
+
+def load_table_cells():
+    """ Every table cell in every source document """
+    cells = []
+    for docx_filepath in get_source_documents():
+        for row in read_table_rows(docx_filepath):
+            cells += row
+    return cells
+
+
+def load_rule_strings():
+    """ The distinct rule strings in the corpus: the rule columns of every source document, split into
+    individual rules in the same way as the rule sets split them, plus the rendered rules from
+    the current exports, which exercise the markdown and hyperlink rewrites """
+    rule_strings = []
+    for docx_filepath in get_source_documents():
+        for row in read_table_rows(docx_filepath)[1:]:
+            for cell in row[1:]:
+                rule_strings += cell.strip(";").split(";")
+
+    export_folder = os.path.join(os.getcwd(), "resources", "export")
+    for export_filename in sorted(os.listdir(export_folder)):
+        # Only the standard exports hold the rules in full; the other formats are structured differently
+        if func.get_agreement_name(export_filename) is None:
+            continue
+        with open(os.path.join(export_folder, export_filename)) as f:
+            for rule_set in json.load(f)["rule_sets"]:
+                for rule in rule_set["rules"]:
+                    rule_strings.append(rule["rule"])
+
+    return list(dict.fromkeys(rule_strings))
+
+
+def get_build_context():
+    """ A build context with just the reference data that rules need """
+    context = BuildContext()
+    with open(os.path.join(os.getcwd(), "resources", "defaults", "all_rules.json")) as f:
+        context.all_rules_with_classes = json.load(f)
+    context.corrections = Corrections.load(os.path.join(os.getcwd(), "resources", "data", "corrections.json"))
+    return context
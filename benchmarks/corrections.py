@@ -0,0 +1,127 @@
+""" Equivalence check and benchmark for the compiled corrections.
+
+Checks that Corrections.apply gives exactly the same output as applying the corrections one at a
+time with str.replace, in order, as the rules and subdivisions used to:
+
+- with corrections.json, over every rule string and table cell in the corpus, and over random
+  strings built from pieces of the corrections' own 'from' and 'to' texts, which is where
+  corrections could interact
+- with random correction lists over a small alphabet, so that overlapping corrections, and so
+  the splitting into stages, are exercised far more than by corrections.json
+
+then times both over the corpus.
+
+Run from the root of the repository:
+
+    python -m benchmarks.corrections
+    python -m benchmarks.corrections --cases 100000
+"""
+import os
+import time
+import random
+import argparse
+
+from classes.corrections import Corrections
+from benchmarks.corpus import load_rule_strings, load_table_cells
+
+SEED = 0
+REPEATS = 5
+
+
+def apply_in_sequence(corrections, s):
+    for correction in corrections:
+        s = s.replace(correction["from"], correction["to"])
+    return s
+
+
+def get_pieces(corrections):
+    """ The 'from' and 'to' texts, their prefixes and suffixes, and the characters in them """
+    pieces = set()
+    for correction in corrections:
+        for text in (correction["from"], correction["to"]):
+            pieces.add(text)
+            for length in range(1, min(len(text), 8)):
+                pieces.add(text[:length])
+                pieces.add(text[-length:])
+            pieces.update(text)
+    return sorted(pieces)
+
+
+def get_random_string(generator, pieces, length):
+    return "".join(generator.choice(pieces) for i in range(generator.randrange(length + 1)))
+
+
+def get_random_corrections(generator):
+    alphabet = "ab;:"
+    corrections = []
+    for i in range(generator.randrange(1, 8)):
+        corrections.append({
+            "from": get_random_string(generator, alphabet, 3) or "a",
+            "to": get_random_string(generator, alphabet, 3)
+        })
+    return corrections
+
+
+def find_differences(corrections, strings):
+    compiled = Corrections(corrections)
+    return [s for s in strings if compiled.apply(s) != apply_in_sequence(corrections, s)]
+
+
+def time_apply(apply, strings):
+    best = None
+    for i in range(REPEATS):
+        start = time.perf_counter()
+        for s in strings:
+            apply(s)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=100000, help="the number of random strings, and of random correction lists")
+    arguments = parser.parse_args()
+
+    compiled = Corrections.load(os.path.join(os.getcwd(), "resources", "data", "corrections.json"))
+    corpus = list(dict.fromkeys(load_rule_strings() + load_table_cells()))
+    generator = random.Random(SEED)
+    pieces = get_pieces(compiled.corrections)
+    random_strings = [get_random_string(generator, pieces, 12) for i in range(arguments.cases)]
+
+    failed = False
+    for label, strings in (("corpus strings", corpus), ("random strings", random_strings)):
+        differences = find_differences(compiled.corrections, strings)
+        print("corrections.json, {count} {label}: {differences} differences".format(count=len(strings), label=label, differences=len(differences)))
+        if len(differences) > 0:
+            print("ERROR: e.g. {example!r}".format(example=differences[0]))
+            failed = True
+
+    differing_lists = 0
+    for i in range(arguments.cases):
+        corrections = get_random_corrections(generator)
+        strings = [get_random_string(generator, "ab;:", 12) for j in range(10)]
+        differences = find_differences(corrections, strings)
+        if len(differences) > 0:
+            if differing_lists == 0:
+                print("ERROR: e.g. {corrections!r} on {example!r}".format(corrections=corrections, example=differences[0]))
+            differing_lists += 1
+    print("{count} random correction lists: {differing_lists} with differences".format(count=arguments.cases, differing_lists=differing_lists))
+    if differing_lists > 0:
+        failed = True
+    if failed:
+        return 1
+
+    sequential = time_apply(lambda s: apply_in_sequence(compiled.corrections, s), corpus)
+    staged = time_apply(compiled.apply, corpus)
+    print("\n{stages} stages for {count} corrections; over the corpus: {sequential:.1f} ms in sequence, {staged:.1f} ms compiled".format(
+        stages=len(compiled.stages),
+        count=len(compiled.corrections),
+        sequential=sequential * 1000,
+        staged=staged * 1000
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
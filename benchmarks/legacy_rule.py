@@ -0,0 +1,283 @@
+import re
+import copy
+
+from classes.rule import Rule
+
+
+class LegacyRule(Rule):
+    """
+    The rule text processing as it was before the rewrites were compiled into tables, kept
+    verbatim so that benchmarks can check the compiled tables produce identical output
+    """
+    def check_for_mistyped_opening_hyphens(self):
+        self.rule_string = re.sub(r'\n-([^ ])', "\n- \\1", self.rule_string)
+
+    def cleanse(self):
+        self.rule_string = self.rule_string.replace("—", "-")
+        self.rule_string = self.rule_string.replace("—", "-")
+        self.rule_string = self.rule_string.replace(";\n-", "\n-")
+        self.rule_string = self.rule_string.replace("; and", ", and")
+        self.rule_string = self.rule_string.replace(";\nor\n", "; or\n")
+        self.rule_string = self.rule_string.replace("product\nor\nManufacture", "product; or\nManufacture")
+        self.rule_string = self.rule_string.replace("Manufacture in which;", "Manufacture in which:")
+        self.rule_string = self.rule_string.replace("Manufacture;", "Manufacture:")
+        self.rule_string = self.rule_string.replace("MaxNOM", "MAXNOM")
+        self.rule_string = self.rule_string.strip()
+        self.rule_string = re.sub(r'[ \t]+', " ", self.rule_string)
+        self.rule_string = self.rule_string.replace(" %", "%")
+        self.rule_string = self.rule_string.replace(" cm", "&nbsp;cm")
+        self.rule_string = re.sub(r'MAXNOM ([0-9]{1,3}%) \(EXW\)', "A maximum of \\1 of the EXW is made up of non-originating parts (MaxNOM)", self.rule_string)
+        self.rule_string = re.sub(r'RVC ([0-9]{1,3})% \(FOB\)', "Your goods contain a Regional Value Content (RVC) of at least \\1% of the Free on Board (FOB) cost of the goods", self.rule_string)
+        self.rule_string = re.sub(r'([^\(])FOB', "\\1Free on Board (FOB) cost", self.rule_string)
+        self.rule_string = re.sub("\t", " ", self.rule_string)
+
+        self.rule_string = self.rule_string.replace("and/or", "and&nbsp;/&nbsp;or")
+
+        if self.rule_string[0:4] == "and\n":
+            self.boolean_operator = "and"
+
+        if self.rule_string[0:5] == "and -":
+            self.boolean_operator = "and"
+
+        elif self.rule_string[0:3] == "or\n":
+            self.boolean_operator = "or"
+
+        elif self.rule_string[0:3] == "or ":
+            self.boolean_operator = "or"
+
+        self.rule_string = self.rule_string.removeprefix("and\n")
+        self.rule_string = self.rule_string.removeprefix("and -")
+        self.rule_string = self.rule_string.removeprefix("or\n")
+        self.rule_string = self.rule_string.removeprefix("or ")
+        self.rule_string = self.rule_string.removeprefix("- ")
+        self.rule_string = self.rule_string.removesuffix(".")
+        self.rule_string = self.rule_string.removeprefix("or ")
+
+        self.rule_string = re.sub("\(([a-z])\) ", "\n- (\\1) ", self.rule_string)
+        self.rule_string = re.sub("\(([a-z])\) ", "\\1) ", self.rule_string)
+        self.rule_string = self.rule_string.replace("ex- works", "ex-works")
+        self.rule_string = self.rule_string.replace("semi heated", "semi-heated")
+        self.rule_string = self.rule_string.replace("whether or note", "whether or not")
+        self.rule_string = self.rule_string.replace("Manufacture form", "Manufacture from")
+        self.rule_string = self.rule_string.replace("nonassembled", "non-assembled")
+
+        self.rule_string = self.rule_string.replace("\n- \n- ", "\n- ")
+        self.rule_string = self.rule_string.replace(": - ", ":\n- ")
+        self.rule_string = self.rule_string.replace("; - ", ";\n- ")
+        self.rule_string = self.rule_string.replace("; and - ", "; and \n- ")
+
+        self.rule_string = self.rule_string.replace("\u2014", "-")
+        if len(self.rule_string) > 0:
+            self.rule_string = self.rule_string[0].upper() + self.rule_string[1:]
+
+        self.rule_string = self.rule_string.replace("Weaving combined with making-up including cutting", "Weaving, combined with making-up, including cutting")
+        self.rule_string = self.rule_string.replace("in column (3)", "in the rule above")
+        self.rule_string = self.rule_string.replace("non originating", "non-originating")
+        self.rule_string = self.rule_string.replace("shall not exceed", "must not exceed")
+
+        if self.rule_string == "." or self.rule_string.lower().startswith("as specified for"):
+            self.rule_string = ""
+
+        # The corrections one at a time, in order, rather than through the compiled stages
+        for correction in self.context.corrections.corrections:
+            self.rule_string = self.rule_string.replace(correction["from"], correction["to"])
+        self.rule_string = self.rule_string.replace("- - ", "- ")
+        self.rule_string = self.rule_string.replace(",\n- and\n\n", ", and\n")
+        self.rule_string = self.rule_string.replace(",\n- and\n", ", and\n")
+
+        # Remove deliberately inserted <b> tags and replace with markdown
+        self.rule_string = self.rule_string.replace("<b>", "**")
+        self.rule_string = self.rule_string.replace("</b>", "**")
+        self.rule_string = self.rule_string.replace(", or\n", ", *or*\n")
+        self.rule_string = self.rule_string.replace("in which\n", "in which:\n")
+        
+        tmp = copy.copy(self.rule_string).strip("\n").strip()
+        if len(tmp) > 3:
+            if tmp[-2:] == "or":
+                obj = {
+                    "heading": self.heading,
+                    "rule": self.rule_string
+                }
+                self.context.rule_ends_with_or.append(obj)
+                a = 1
+        a = 1
+
+    def remove_footnote_references(self):
+        self.rule_string = re.sub("\( ([0-9]{1,3}) \)", "", self.rule_string)
+
+    def embolden_percentages(self):
+        self.rule_string = re.sub("([0-9]{1,3}),([0-9]{1,3}([ %]))", "\\1.\\2\\3", self.rule_string)
+        self.rule_string = self.rule_string.replace(" per cent", "%")
+        self.rule_string = self.rule_string.replace("  ", " ")
+        self.rule_string = self.rule_string.replace(" %", "%")
+        self.rule_string = re.sub("([0-9]{1,3}\.[0-9]{1,2}%)", "**\\1**", self.rule_string)
+        self.rule_string = re.sub("([0-9]{1,3}),([0-9]{1,2})\%", "\\1.\\2%", self.rule_string)
+        self.rule_string = re.sub(" ([0-9]{1,3}\%)", " **\\1**", self.rule_string)
+
+    def hyperlink_headings(self):
+        self.rule_string = self.rule_string.strip()
+        self.rule_string = re.sub("([0-9]{2}).([0-9]{2})$", " \\1\\2.", self.rule_string)
+        
+        self.rule_string = self.rule_string.replace("headings Nos ", "heading ")
+        self.rule_string = self.rule_string.replace("headings No ", "heading ")
+        self.rule_string = self.rule_string.replace("heading Nos ", "heading ")
+        self.rule_string = self.rule_string.replace("heading No ", "heading ")
+        self.rule_string = self.rule_string.replace("sub-heading", "subheading")
+        self.rule_string = self.rule_string.replace("Sub-heading", "Subheading")
+        self.rule_string = self.rule_string.replace("Chapter", "chapter")
+
+        self.rule_string = re.sub(" ([0-9]{2}).([0-9]{2})([., ])", " \\1\\2\\3", self.rule_string)
+        self.rule_string = re.sub(" ([0-9]{1,4}) through ([0-9]{1,4})([., ])", " \\1 to \\2\\3", self.rule_string)
+
+        # Deal with subheadings
+        self.rule_string = re.sub(" ([0-9]{4}).([0-9]{2})([., ])", " \\1\\2\\3", self.rule_string)
+        self.rule_string = re.sub("subheadings", "subheading", self.rule_string)
+        self.rule_string = re.sub(" subheading ([0-9]{4}) to ([0-9]{4})([., ])", " subheading \\1 to subheading \\2\\3", self.rule_string)
+
+        for i in range(0, 4):
+            self.rule_string = re.sub(" subheading ([0-9]{6}), ([0-9]{6})([., ])", " subheading \\1, subheading \\2\\3", self.rule_string)
+
+        self.rule_string = re.sub(" subheading ([0-9]{6}) and ([0-9]{6})([., ])", " subheading \\1 and subheading \\2\\3", self.rule_string)
+        self.rule_string = re.sub(" subheading ([0-9]{6}) and ([0-9]{6})$", " subheading \\1 and subheading \\2", self.rule_string)
+
+        self.rule_string = re.sub(" subheading ([0-9]{6}) or ([0-9]{6})([., ])", " subheading \\1 or subheading \\2\\3", self.rule_string)
+        self.rule_string = re.sub(" subheading ([0-9]{6}) or ([0-9]{6})$", " subheading \\1 or subheading \\2", self.rule_string)
+
+        self.rule_string = re.sub(" subheading ([0-9]{6}) to ([0-9]{6})([., ])", " subheading \\1 to subheading \\2\\3", self.rule_string)
+        self.rule_string = re.sub(" subheading ([0-9]{6}) to ([0-9]{6})$", " subheading \\1 to subheading \\2", self.rule_string)
+
+        self.rule_string = re.sub("([Ss]ubheading) ([0-9]{6})([ ,;.])", "[\\1 \\2](/subheadings/\\2x0000-80)\\3", self.rule_string)  # Links in markdown
+        self.rule_string = re.sub("x0000-80", "0000-80", self.rule_string)
+        self.rule_string = re.sub(" heading ([0-9]{2}).([0-9]{2})\n", " [heading \\1\\2](/headings/\\1\\2)\n", self.rule_string)
+
+        # Deal with headings
+        self.rule_string = re.sub("headings", "heading", self.rule_string)
+        self.rule_string = re.sub(" heading ([0-9]{4}) to ([0-9]{4})([., ])", " heading \\1 to heading \\2\\3", self.rule_string)
+
+        for i in range(0, 4):
+            self.rule_string = re.sub(" heading ([0-9]{4}), ([0-9]{4})([., ])", " heading \\1, heading \\2\\3", self.rule_string)
+
+        self.rule_string = re.sub(" heading ([0-9]{4}) and ([0-9]{4})([., ])", " heading \\1 and heading \\2\\3", self.rule_string)
+        self.rule_string = re.sub(" heading ([0-9]{4}) and ([0-9]{4})$", " heading \\1 and heading \\2", self.rule_string)
+
+        self.rule_string = re.sub(" heading ([0-9]{4}) or ([0-9]{4})([., ])", " heading \\1 or heading \\2\\3", self.rule_string)
+        self.rule_string = re.sub(" heading ([0-9]{4}) or ([0-9]{4})$", " heading \\1 or heading \\2", self.rule_string)
+
+        self.rule_string = re.sub(" heading ([0-9]{4}) to ([0-9]{4})([., ])", " heading \\1 to heading \\2\\3", self.rule_string)
+        self.rule_string = re.sub(" heading ([0-9]{4}) to ([0-9]{4})$", " heading \\1 to heading \\2", self.rule_string)
+
+        self.rule_string = re.sub(" heading ([0-9]{4})$", " heading \\1", self.rule_string)
+        self.rule_string = re.sub(" heading ([0-9]{4})\n", " heading \\1.\n", self.rule_string)
+
+        self.rule_string = re.sub("([Hh]eading)(s*) ([0-9]{1,4})([ ,;.])", "[\\1\\2 \\3](/headings/\\3)\\4", self.rule_string)  # Links in markdown
+
+        # Deal with chapters
+        self.rule_string = self.rule_string.replace("Chapter", "chapter")
+        self.rule_string = self.rule_string.replace("chapters", "chapter")
+        for i in range(0, 4):
+            self.rule_string = re.sub(" chapter ([0-9]{1,2}), ([0-9]{1,2})([ ,;.])", " chapter \\1, chapter \\2\\3", self.rule_string)
+
+        self.rule_string = re.sub("chapter ([0-9]{1,2}) to ([0-9]{1,2})([., ])", "chapter \\1 to chapter \\2\\3", self.rule_string)
+
+        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9])([ ,;.])", "\\1\\2 0\\3\\4", self.rule_string)
+        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9][0-9]) and ([1-9]) ", "\\1\\2 \\3 and 0\\4 ", self.rule_string)
+        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9]{1,2}) and ([0-9]{1,2})", "[\\1 \\3](/chapters/\\3) and chapter \\4", self.rule_string)  # Links in markdown
+        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9]{1,2}) or ([0-9]{1,2})", "[\\1 \\3](/chapters/\\3) or chapter \\4", self.rule_string)  # Links in markdown
+        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9])([ ,;.])", "[\\1\\2  \\3](/chapters/0\\3)\\4", self.rule_string)  # Links in markdown
+        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9]{1,2})([ ,;.])", "[\\1\\2 \\3](/chapters/\\3)\\4", self.rule_string)  # Links in markdown
+        self.rule_string = re.sub("chapter 0([1-9])", "chapter \\1", self.rule_string)
+
+        self.rule_string = re.sub(" +", " ", self.rule_string)
+
+        # Add in non-breaking spaces
+        self.rule_string = re.sub("chapter ([0-9]{1,2})", "chapter&nbsp;\\1", self.rule_string)
+        self.rule_string = re.sub("subheading ([0-9]{6})", "subheading&nbsp;\\1", self.rule_string)
+        self.rule_string = re.sub("heading ([0-9]{4})", "heading&nbsp;\\1", self.rule_string)
+
+    def get_rule_class(self):
+        if "85.07" in self.heading:
+            a = 1
+        self.rule_class = []
+        self.rule_string_original = self.rule_string_original.replace("A change from any other heading", "CTH")  # For Canada
+
+        cc_string = "<abbr title='Change of tariff chapter'>CC</abbr>: All non-originating materials used in the production of the good have undergone a change in tariff classification at the 2-digit level (chapter)"
+        ctsh_string = "<abbr title='Change of tariff subheading'>CTSH</abbr>: All non-originating materials used in the production of the good have undergone a change in tariff classification at the 6-digit level (tariff subheading)"
+        cth_string = "<abbr title='Change of tariff heading'>CTH</abbr>: All non-originating materials used in the production of the good have undergone a change in tariff classification at the 4-digit level (tariff heading)"
+        cths_string = "<abbr title='Change to the split heading'>CTHS</abbr>: change to the split heading in question from any other split of this heading or from any other heading"
+        ctshs_string = "<abbr title='Change to the split subheading'>CTSHS</abbr>: change to the split subheading in question from any other split of this subheading or from any other subheading or heading"
+
+        tmp = self.rule_string.lower()
+        if self.rule_string_original == "CTH":
+            self.rule_string = cth_string
+            self.rule_class = ["CTH"]
+
+        elif "CTSHS" in self.rule_string_original:
+            self.rule_string = self.rule_string.replace("CTSHS", ctshs_string)
+            self.rule_class = ["CTSHS"]
+            if "in which" in tmp or "provided that" in tmp:
+                self.rule_class.append("MAXNOM")
+
+        elif "CTHS" in self.rule_string_original:
+            self.rule_string = self.rule_string.replace("CTHS", cths_string)
+            self.rule_class = ["CTHS"]
+            if "in which" in tmp or "provided that" in tmp:
+                self.rule_class.append("MAXNOM")
+
+        elif "CTSH" in self.rule_string_original:
+            self.rule_string = self.rule_string.replace("CTSH", ctsh_string)
+            self.rule_class = ["CTSH"]
+            if "in which" in tmp or "provided that" in tmp:
+                self.rule_class.append("MAXNOM")
+
+        elif "CTH" in self.rule_string_original:
+            self.rule_string = self.rule_string.replace("CTH", cth_string)
+            self.rule_class = ["CTH"]
+            if "in which" in tmp or "provided that" in tmp:
+                self.rule_class.append("MAXNOM")
+
+        if self.rule_string_original == "WO":
+            self.rule_string = "All goods must be wholly obtained."
+            self.rule_class = ["WO"]
+
+        if self.rule_string_original == "CTSH":
+            self.rule_string = "<abbr title='Change of tariff subheading'>CTSH</abbr>: All non-originating materials used in the production of the good have undergone a change in tariff classification at the 6-digit level (subheading)."
+            self.rule_class = ["CTSH"]
+
+        if self.rule_string_original == "CC":
+            self.rule_string = "<abbr title='Change of tariff chapter'>CC</abbr>: All non-originating materials used in the production of the good have undergone a change in tariff classification at the 2-digit level (chapter)."
+            self.rule_class = ["CC"]
+
+        elif "CC" in self.rule_string_original:
+            self.rule_string = self.rule_string.replace("CC", cc_string)
+            self.rule_class = ["CC"]
+
+        # Deal with MaxNOMs
+        self.rule_string = self.rule_string.replace("Max Nom", "MAXNOM")
+        self.rule_string = self.rule_string.replace("MaxNom", "MAXNOM")
+        self.rule_string = self.rule_string.replace("MaxNOM", "MAXNOM")
+        self.rule_string = self.rule_string.replace("MAXNOM (EXW)", "MAXNOM of the EXW of the good")
+
+        if "MAXNOM" in self.rule_string:
+            self.rule_string = re.sub("([0-9]{1,3})% MAXNOM", "The maximum value of non-originating materials (MaxNOM) cannot exceed \\1%", self.rule_string)
+            self.rule_class.append("MAXNOM")
+
+        if "your goods are produced from non-originating materials of any heading" in tmp \
+                or ("production from non-originating materials of any heading" in tmp and "except" not in tmp):
+            self.rule_class.append("Insufficient processing")
+            if "in which" in tmp:
+                self.rule_class.append("MAXNOM")
+
+        if "wholly obtained" in self.rule_string:
+            self.rule_class = ["WO"]
+
+        if "RVC" in self.rule_string:
+            self.rule_class = ["RVC"]
+
+        if "value of non-originating" in self.rule_string_original:
+            self.rule_class = ["MAXNOM"]
+
+        if re.search("exceed[s]? [0-9]{1,3}% of", self.rule_string) and "value" in self.rule_string:
+            self.rule_class = ["MAXNOM"]
+
+        self.rule_string = self.rule_string.replace("EXW", "ex-works price (EXW)")
+        self.rule_string = self.rule_string.replace("I.C.C.A.T.", "ICCAT")
@@ -0,0 +1,143 @@
+""" Load test for the rule lookup.
+
+Loads every export in resources/export (or every binary index, with --binary), then:
+
+- times each lookup in the index itself, for a sample of commodity codes in every agreement
+- starts the lookup server on a free local port and sends it the same lookups from a number of
+  client threads, each over its own kept-alive connection, timing every request
+
+and reports the median (p50) and 99th percentile (p99) latency and the queries per second.
+
+Run from the root of the repository:
+
+    python -m benchmarks.lookup_load_test
+    python -m benchmarks.lookup_load_test --clients 8 --requests 20000
+    python -m benchmarks.lookup_load_test --binary
+"""
+import os
+import time
+import random
+import argparse
+import threading
+import http.client
+
+from classes.rule_lookup import AgreementLookup
+from classes.lookup_server import LookupServer
+
+SEED = 0
+
+
+def get_queries(agreement_lookup, count):
+    """ Random agreements and codes: half are the min or max of one of the agreement's rule sets,
+    and half are any 10-digit code """
+    generator = random.Random(SEED)
+    agreements = agreement_lookup.get_agreements()
+    queries = []
+    for i in range(count):
+        agreement = generator.choice(agreements)
+        lookup = agreement_lookup.get_lookup(agreement)
+        if i % 2 == 0 and len(lookup.mins) > 0:
+            bounds = lookup.mins if generator.random() < 0.5 else lookup.maxes
+            code = "{code:010d}".format(code=int(bounds[generator.randrange(len(bounds))]))
+        else:
+            code = "{code:010d}".format(code=generator.randrange(10 ** 10))
+        queries.append((agreement, code))
+    return queries
+
+
+def get_percentile(latencies, percentile):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+
+def report(label, latencies, elapsed):
+    print("{label:<24}{count:>10}{p50:>12.1f}{p99:>12.1f}{qps:>12.0f}".format(
+        label=label,
+        count=len(latencies),
+        p50=get_percentile(latencies, 50) * 1000000,
+        p99=get_percentile(latencies, 99) * 1000000,
+        qps=len(latencies) / elapsed
+    ))
+
+
+def time_index(agreement_lookup, queries):
+    latencies = []
+    start = time.perf_counter()
+    for agreement, code in queries:
+        lookup = agreement_lookup.get_lookup(agreement)
+        query_start = time.perf_counter()
+        lookup.find_indexes(code)
+        latencies.append(time.perf_counter() - query_start)
+    return latencies, time.perf_counter() - start
+
+
+def time_server(agreement_lookup, queries, clients):
+    server = LookupServer(("127.0.0.1", 0), agreement_lookup, quiet=True)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    port = server.server_address[1]
+
+    latencies = []
+    failures = []
+
+    def run_client(client_queries):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        client_latencies = []
+        for agreement, code in client_queries:
+            query_start = time.perf_counter()
+            connection.request("GET", "/lookup?agreement={agreement}&code={code}".format(agreement=agreement, code=code))
+            response = connection.getresponse()
+            response.read()
+            client_latencies.append(time.perf_counter() - query_start)
+            if response.status != 200:
+                failures.append((agreement, code, response.status))
+        connection.close()
+        latencies.extend(client_latencies)
+
+    # Prime the encoded rule sets, so that the timings are of the steady state
+    run_client(queries[:1000])
+    del latencies[:]
+
+    threads = [threading.Thread(target=run_client, args=(queries[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    server.server_close()
+    return latencies, elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--binary", action="store_true", help="load the binary indexes rather than the JSON exports")
+    parser.add_argument("--export-folder", default=os.path.join(os.getcwd(), "resources", "export"))
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    agreement_lookup = AgreementLookup(arguments.export_folder, binary=arguments.binary)
+    print("Loaded {count} agreements in {elapsed:.0f} ms\n".format(
+        count=len(agreement_lookup.get_agreements()),
+        elapsed=(time.perf_counter() - start) * 1000
+    ))
+    queries = get_queries(agreement_lookup, arguments.requests)
+
+    print("{label:<24}{count:>10}{p50:>12}{p99:>12}{qps:>12}".format(label="", count="queries", p50="p50 us", p99="p99 us", qps="QPS"))
+    latencies, elapsed = time_index(agreement_lookup, queries)
+    report("index", latencies, elapsed)
+    latencies, elapsed, failures = time_server(agreement_lookup, queries, arguments.clients)
+    report("HTTP, {clients} clients".format(clients=arguments.clients), latencies, elapsed)
+
+    if len(failures) > 0:
+        print("\nERROR: {count} requests failed, e.g. {example}".format(count=len(failures), example=failures[0]))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+""" Micro-benchmark for the text normalizer.
+
+Checks that the translation tables in classes/normalizer.py produce byte-identical output to
+the original replace-by-replace implementation, over every table cell in the corpus and over
+random strings made up of the characters that the normalizer maps, then times both.
+
+Run from the root of the repository:
+
+    python -m benchmarks.normalizer
+"""
+import time
+import random
+
+from classes.normalizer import Normalizer, CONTROLS, HYPHENS, MINUSES, QUOTES, SLASHES, TILDES
+from benchmarks.legacy_normalizer import LegacyNormalizer
+from benchmarks.corpus import load_table_cells
+
+REPEATS = 5
+RANDOM_STRINGS = 100000
+
+# The settings of the normalizers used by the build and of those defined in classes/normalizer.py
+SETTINGS = [
+    {},
+    {"strip": True, "collapse": True},
+    {"strip": True, "collapse": True, "hyphens": True, "quotes": True, "ellipsis": True, "tildes": True},
+    {"strip": False, "slashes": True},
+    {"form": None}
+]
+
+ALPHABET = sorted(
+    CONTROLS | HYPHENS | MINUSES | QUOTES | SLASHES | TILDES
+    | set("\u000b\u000c\u0085\u2028\u2029\r\n\t\xa0\u00ad\u2026 .aex0") | {"ﬁ", "½", "é"}
+)
+
+
+def get_random_strings():
+    generator = random.Random(0)
+    return ["".join(generator.choice(ALPHABET) for i in range(generator.randint(0, 24))) for j in range(RANDOM_STRINGS)]
+
+
+def check_identical(texts):
+    differences = []
+    for settings in SETTINGS:
+        normalizer = Normalizer(**settings)
+        legacy_normalizer = LegacyNormalizer(**settings)
+        for text in texts:
+            if normalizer.normalize(text) != legacy_normalizer.normalize(text):
+                differences.append((settings, text))
+    return differences
+
+
+def time_normalizer(normalizer, texts):
+    best = None
+    for i in range(REPEATS):
+        start = time.perf_counter()
+        for text in texts:
+            normalizer.normalize(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    cells = load_table_cells()
+    print("Corpus: {count} table cells\n".format(count=len(cells)))
+
+    differences = check_identical(cells + get_random_strings())
+    if len(differences) > 0:
+        print("ERROR: {count} strings differ from the original implementation, e.g.\n\n{example!r}".format(
+            count=len(differences),
+            example=differences[0]
+        ))
+        return 1
+    print("Output is byte-identical to the original implementation\n")
+
+    legacy = time_normalizer(LegacyNormalizer(), cells)
+    compiled = time_normalizer(Normalizer(), cells)
+    print("{label:<28}{legacy:>13}{compiled:>13}{speed_up:>10}".format(label="", legacy="original", compiled="compiled", speed_up="speed-up"))
+    print("{label:<28}{legacy:>10.1f} ms{compiled:>10.1f} ms{speed_up:>9.1f}x".format(
+        label="normalize (table cells)",
+        legacy=legacy * 1000,
+        compiled=compiled * 1000,
+        speed_up=legacy / compiled if compiled > 0 else 0
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
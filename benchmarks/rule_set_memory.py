@@ -0,0 +1,133 @@
+""" Memory benchmark for the legacy rule sets.
+
+Builds each legacy document (without writing its exports) and records every copy of a rule set
+that the build makes. The copies are then made again, once as they are now, with slots, and once
+as they were when each rule set kept its attributes in a dict, measuring the memory allocated
+and the time taken by each.
+
+Run from the root of the repository, optionally naming the documents to build:
+
+    python -m benchmarks.rule_set_memory
+    python -m benchmarks.rule_set_memory "Albania PSR.docx" "Japan PSR.docx"
+"""
+import io
+import os
+import sys
+import copy
+import time
+import tracemalloc
+import contextlib
+
+from classes.roo_document import RooDocument
+from classes.rule_set_legacy import RuleSetLegacy
+from benchmarks.corpus import get_source_documents
+
+
+class DictRuleSet(object):
+    """ A rule set as it was before slots: the same attributes, held in an instance dict """
+    pass
+
+
+class MeasuredDocument(RooDocument):
+    """ Builds a document without writing the export or the reports """
+    def write_json_file(self):
+        self.copy_rule_sets_to_object_list()
+
+    def write_report_on_rules_ending_with_or(self):
+        pass
+
+
+def to_dict_rule_set(rule_set):
+    record = DictRuleSet()
+    for name in RuleSetLegacy.__slots__:
+        setattr(record, name, getattr(rule_set, name))
+    return record
+
+
+def measure_copies(rule_sets):
+    """ The memory allocated by copying each of the rule sets, and the time taken """
+    copies = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    for rule_set in rule_sets:
+        copies.append(copy.copy(rule_set))
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated, elapsed
+
+
+def build_document(docx_filename, copies):
+    """ Builds the document, collecting the copies of rule sets made along the way, and returns
+    the peak memory traced during the build """
+    del copies[:]
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            MeasuredDocument(docx_filename)
+    except SystemExit:
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    if len(sys.argv) > 1:
+        docx_filenames = sys.argv[1:]
+    else:
+        docx_filenames = [os.path.basename(docx_filepath) for docx_filepath in get_source_documents()]
+
+    copies = []
+    slots_copy = RuleSetLegacy.__copy__
+
+    def recording_copy(rule_set):
+        duplicate = slots_copy(rule_set)
+        copies.append(duplicate)
+        return duplicate
+
+    RuleSetLegacy.__copy__ = recording_copy
+
+    print("{document:<36}{copies:>8}{dict_bytes:>12}{slots_bytes:>12}{dict_time:>11}{slots_time:>11}{peak:>12}".format(
+        document="", copies="copies", dict_bytes="dict KiB", slots_bytes="slots KiB",
+        dict_time="dict ms", slots_time="slots ms", peak="peak MiB"
+    ))
+    totals = [0, 0, 0, 0.0, 0.0]
+    for docx_filename in docx_filenames:
+        peak = build_document(docx_filename, copies)
+        if len(copies) == 0:
+            continue
+
+        RuleSetLegacy.__copy__ = slots_copy
+        slots_allocated, slots_elapsed = measure_copies(copies)
+        dict_allocated, dict_elapsed = measure_copies([to_dict_rule_set(rule_set) for rule_set in copies])
+        RuleSetLegacy.__copy__ = recording_copy
+
+        print("{document:<36}{copies:>8}{dict_bytes:>12.0f}{slots_bytes:>12.0f}{dict_time:>11.1f}{slots_time:>11.1f}{peak:>12.1f}".format(
+            document=docx_filename.replace(" PSR.docx", ""),
+            copies=len(copies),
+            dict_bytes=dict_allocated / 1024,
+            slots_bytes=slots_allocated / 1024,
+            dict_time=dict_elapsed * 1000,
+            slots_time=slots_elapsed * 1000,
+            peak=peak / (1024 * 1024)
+        ))
+        totals[0] += len(copies)
+        totals[1] += dict_allocated
+        totals[2] += slots_allocated
+        totals[3] += dict_elapsed
+        totals[4] += slots_elapsed
+
+    print("{document:<36}{copies:>8}{dict_bytes:>12.0f}{slots_bytes:>12.0f}{dict_time:>11.1f}{slots_time:>11.1f}".format(
+        document="Total",
+        copies=totals[0],
+        dict_bytes=totals[1] / 1024,
+        slots_bytes=totals[2] / 1024,
+        dict_time=totals[3] * 1000,
+        slots_time=totals[4] * 1000
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
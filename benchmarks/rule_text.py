@@ -0,0 +1,93 @@
+""" Micro-benchmark for the rule text rewrites.
+
+Checks that the compiled rewrite tables in classes/rule.py produce byte-identical output to the
+original step-by-step implementation over every rule in the corpus, then times both.
+
+Run from the root of the repository:
+
+    python -m benchmarks.rule_text
+"""
+import time
+
+from classes.rule import Rule
+from benchmarks.legacy_rule import LegacyRule
+from benchmarks.corpus import load_rule_strings, get_build_context
+
+REPEATS = 5
+
+
+def build_rules(rule_class, rule_strings, context):
+    return [rule_class(rule_string, "", context).as_dict() for rule_string in rule_strings]
+
+
+def time_rules(rule_class, rule_strings, context):
+    best = None
+    for i in range(REPEATS):
+        start = time.perf_counter()
+        build_rules(rule_class, rule_strings, context)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_method(rule_class, method_name, rule_strings):
+    """ Times a single text method in isolation, on objects that only carry the rule string """
+    method = getattr(rule_class, method_name)
+    best = None
+    for i in range(REPEATS):
+        rules = []
+        for rule_string in rule_strings:
+            rule = rule_class.__new__(rule_class)
+            rule.rule_string = rule_string
+            rules.append(rule)
+        start = time.perf_counter()
+        for rule in rules:
+            method(rule)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def check_identical(rule_strings):
+    legacy_context = get_build_context()
+    compiled_context = get_build_context()
+    legacy = build_rules(LegacyRule, rule_strings, legacy_context)
+    compiled = build_rules(Rule, rule_strings, compiled_context)
+    differences = [rule_strings[i] for i in range(len(rule_strings)) if legacy[i] != compiled[i]]
+    if legacy_context.rule_ends_with_or != compiled_context.rule_ends_with_or:
+        differences.append("(rule_ends_with_or report)")
+    return differences
+
+
+def report(label, legacy, compiled):
+    print("{label:<28}{legacy:>10.1f} ms{compiled:>10.1f} ms{speed_up:>9.1f}x".format(
+        label=label,
+        legacy=legacy * 1000,
+        compiled=compiled * 1000,
+        speed_up=legacy / compiled if compiled > 0 else 0
+    ))
+
+
+def main():
+    rule_strings = load_rule_strings()
+    print("Corpus: {count} rule strings\n".format(count=len(rule_strings)))
+
+    differences = check_identical(rule_strings)
+    if len(differences) > 0:
+        print("ERROR: {count} rules differ from the original implementation, e.g.\n\n{example!r}".format(
+            count=len(differences),
+            example=differences[0]
+        ))
+        return 1
+    print("Output is byte-identical to the original implementation\n")
+
+    context = get_build_context()
+    print("{label:<28}{legacy:>13}{compiled:>13}{speed_up:>10}".format(label="", legacy="original", compiled="compiled", speed_up="speed-up"))
+    report("Rule (whole pipeline)", time_rules(LegacyRule, rule_strings, context), time_rules(Rule, rule_strings, context))
+    for method_name in ("hyperlink_headings", "embolden_percentages"):
+        report(method_name, time_method(LegacyRule, method_name, rule_strings), time_method(Rule, method_name, rule_strings))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
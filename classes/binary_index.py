@@ -0,0 +1,115 @@
+import json
+import mmap
+import struct
+import numpy as np
+
+BINARY_INDEX_MAGIC = b"ROOINDEX"
+BINARY_INDEX_VERSION = 1
+
+# Magic, version, rule set count, payload size
+HEADER = struct.Struct("<8sIIQQ")
+ARRAY_DTYPE = np.dtype("<u8")
+
+
+def serialize_binary_index(rule_set_object_list):
+    """
+    The binary index of an export. All numbers are little-endian; the arrays are of unsigned
+    64-bit integers, one entry per rule set with a 10-digit min and max, in order of min:
+
+    - header: the magic b"ROOINDEX", the version (uint32), 4 bytes of padding, the number of
+      rule sets n (uint64) and the size of the payload (uint64)
+    - mins[n], maxes[n], and running_maxes[n], the running maximum of maxes
+    - positions[n], each rule set's position in the export's rule_sets
+    - offsets[n + 1], the start of each rule set in the payload, and the end of the last
+    - payload, the rule sets as JSON (UTF-8), one after another
+    """
+    entries = []
+    for position, rule_set in enumerate(rule_set_object_list):
+        if is_code(rule_set.get("min")) and is_code(rule_set.get("max")):
+            entries.append((int(rule_set["min"]), position, int(rule_set["max"])))
+    entries.sort()
+
+    payloads = [json.dumps(rule_set_object_list[position]).encode("utf-8") for rule_set_min, position, rule_set_max in entries]
+    offsets = np.zeros(len(entries) + 1, dtype=ARRAY_DTYPE)
+    offsets[1:] = np.cumsum([len(payload) for payload in payloads], dtype=ARRAY_DTYPE)
+    mins = np.array([entry[0] for entry in entries], dtype=ARRAY_DTYPE)
+    maxes = np.array([entry[2] for entry in entries], dtype=ARRAY_DTYPE)
+    positions = np.array([entry[1] for entry in entries], dtype=ARRAY_DTYPE)
+    running_maxes = np.maximum.accumulate(maxes) if len(entries) > 0 else maxes
+
+    header = HEADER.pack(BINARY_INDEX_MAGIC, BINARY_INDEX_VERSION, 0, len(entries), int(offsets[-1]))
+    arrays = b"".join(array.tobytes() for array in (mins, maxes, running_maxes, positions, offsets))
+    return header + arrays + b"".join(payloads)
+
+
+def is_code(code):
+    return isinstance(code, str) and len(code) == 10 and code.isdigit()
+
+
+class BinaryRuleIndex(object):
+    """
+    Reads a binary index (see serialize_binary_index) through a read-only memory map, so that
+    opening one takes no parsing at all, and processes that open the same index share its pages.
+    The arrays are NumPy views onto the map; rule sets are only parsed when they are asked for.
+
+    Look-ups work in the same way as RuleLookup: a binary search for the last range starting at
+    or before the code, then back while the running maximum still reaches the code.
+    """
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, padding, count, payload_size = HEADER.unpack_from(self.map, 0)
+        if magic != BINARY_INDEX_MAGIC or version != BINARY_INDEX_VERSION:
+            raise ValueError("{filepath} is not a version {version} binary index".format(filepath=filepath, version=BINARY_INDEX_VERSION))
+
+        offset = HEADER.size
+        self.mins, offset = self.get_array(offset, count)
+        self.maxes, offset = self.get_array(offset, count)
+        self.running_maxes, offset = self.get_array(offset, count)
+        self.positions, offset = self.get_array(offset, count)
+        self.offsets, offset = self.get_array(offset, count + 1)
+        self.payload_start = offset
+        self.count = count
+
+    def get_array(self, offset, count):
+        array = np.frombuffer(self.map, dtype=ARRAY_DTYPE, count=count, offset=offset)
+        return array, offset + count * ARRAY_DTYPE.itemsize
+
+    def find_indexes(self, code):
+        """ The entries for the rule sets that apply to the (10-digit) code, in export order """
+        code = int(code)
+        found = []
+        entry = int(np.searchsorted(self.mins, code, side="right")) - 1
+        while entry >= 0 and self.running_maxes[entry] >= code:
+            if self.maxes[entry] >= code:
+                found.append(entry)
+            entry -= 1
+        return self.order_indexes(found)
+
+    def get_bounds(self):
+        """ The mins and maxes of the indexed rule sets, in order of min, as integers """
+        return self.mins.tolist(), self.maxes.tolist()
+
+    def order_indexes(self, entries):
+        """ The entries in export order """
+        return sorted(entries, key=lambda entry: self.positions[entry])
+
+    def get_payload(self, entry):
+        return self.map[self.payload_start + int(self.offsets[entry]):self.payload_start + int(self.offsets[entry + 1])]
+
+    def get_rule_sets(self, indexes):
+        return [json.loads(self.get_payload(entry)) for entry in indexes]
+
+    def find(self, code):
+        return self.get_rule_sets(self.find_indexes(code))
+
+    def encode(self, indexes):
+        """ The rule sets of the given entries as a JSON array, straight from the payload """
+        return b"[" + b",".join(self.get_payload(entry) for entry in indexes) + b"]"
+
+    def close(self):
+        # The arrays are views onto the map, so they have to go before it can be closed
+        self.mins = self.maxes = self.running_maxes = self.positions = self.offsets = None
+        self.map.close()
@@ -0,0 +1,31 @@
+class BuildContext(object):
+    """
+    Holds all of the intermediate state for the build of a single document.
+    A new context is created for each document and is passed down through the
+    rule sets and rules, so that no state is shared between builds.
+    """
+    def __init__(self, docx_filename=""):
+        self.docx_filename = docx_filename
+
+        # Lookups derived from the reference data
+        self.all_headings = {}
+        self.all_subheadings = {}
+        self.tariff_hierarchy = None
+        self.all_codes = []
+        self.all_rules_with_classes = {}
+        self.corrections = None
+
+        # Errors and warnings collected while reading the table
+        self.mix_ex_non_ex_errors = []
+        self.non_contiguous_and_errors = []
+        self.multiple_and_errors = []
+        self.multiple_manufacture = []
+        self.possible_missing_hyphens = []
+
+        # Working state used while processing the table
+        self.parent_heading = ""
+        self.residual_added = []
+
+        # Reports
+        self.rule_ends_with_or = []
+        self.multiple_chapter_rule_list = []
@@ -0,0 +1,118 @@
+import os
+import json
+import glob
+import hashlib
+
+from classes.reference_data import get_reference_data_paths
+from classes.export_formats import ExportFormats
+from classes.environment_variable import EnvironmentVariable
+import classes.functions as func
+
+MANIFEST_VERSION = 1
+
+
+class BuildManifest(object):
+    """
+    Records the content hash of every input that contributes to each document's export, so that
+    a batch run only needs to rebuild the documents whose inputs have changed since the last run.
+    """
+    def __init__(self):
+        self.resources_folder = os.path.join(os.getcwd(), "resources")
+        self.filepath = os.path.join(self.resources_folder, "temp", "build_manifest.json")
+        self.file_hashes = {}
+        self.load()
+        self.get_shared_inputs()
+
+    def load(self):
+        self.documents = {}
+        if os.path.exists(self.filepath):
+            try:
+                with open(self.filepath) as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == MANIFEST_VERSION:
+                    self.documents = manifest["documents"]
+            except ValueError:
+                print("- The build manifest could not be read, so all documents will be rebuilt")
+
+    def save(self):
+        """ Written to a temporary file and renamed into place, so that an interrupted run
+        never leaves a truncated manifest behind """
+        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        temp_filepath = self.filepath + ".tmp"
+        with open(temp_filepath, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "documents": self.documents}, f, indent=4)
+        os.replace(temp_filepath, self.filepath)
+
+    def get_shared_inputs(self):
+        """ The inputs that are common to every document: the corrections, the XI rule classes,
+        the commodity code list, the source code of the builder itself, and the settings that
+        change what a build produces or where it is published: the modern documents, the export
+        formats and the OTT prototype folder """
+        all_rules_path, code_list_path = get_reference_data_paths()
+        builder_files = sorted(glob.glob(os.path.join(os.getcwd(), "classes", "*.py")))
+        self.export_formats = ExportFormats.from_environment()
+        self.ott_prototype_path = EnvironmentVariable('ott_prototype_path', 'string', permit_omission=True).value
+        self.shared_inputs = {
+            "corrections": self.hash_file(os.path.join(self.resources_folder, "data", "corrections.json")),
+            "all_rules": self.hash_file(all_rules_path),
+            "code_list": self.hash_file(code_list_path),
+            "builder": self.hash_files(builder_files),
+            "modern_documents": EnvironmentVariable('modern_documents', 'string', permit_omission=True).value,
+            "export_formats": self.export_formats.formats,
+            "ott_prototype_path": self.ott_prototype_path
+        }
+
+    def get_document_inputs(self, docx_filename):
+        export_filename = func.get_export_filename(docx_filename)
+        inputs = {
+            "source": self.hash_file(os.path.join(self.resources_folder, "source", docx_filename)),
+            "footnotes": self.hash_file(os.path.join(self.resources_folder, "config", "config-" + export_filename + ".json"))
+        }
+        inputs.update(self.shared_inputs)
+        return inputs
+
+    def get_export_filepaths(self, docx_filename):
+        """ Every file that the configured export formats produce for the document, in the export
+        folder and, if there is one, the OTT prototype folder """
+        filenames = self.export_formats.get_filenames(func.get_export_filename(docx_filename))
+        folders = [os.path.join(self.resources_folder, "export")]
+        if self.ott_prototype_path != "":
+            folders.append(self.ott_prototype_path)
+        return [os.path.join(folder, filename) for folder in folders for filename in filenames]
+
+    def is_up_to_date(self, docx_filename, inputs):
+        """ A document is up to date if it was last built from exactly these inputs
+        and all of its export files are still in place """
+        entry = self.documents.get(docx_filename)
+        if entry is None:
+            return False
+        if entry["inputs"] != inputs:
+            return False
+        return all(os.path.exists(filepath) for filepath in self.get_export_filepaths(docx_filename))
+
+    def get_multiple_chapter_rule_list(self, docx_filename):
+        return self.documents[docx_filename]["multiple_chapter_rule_list"]
+
+    def record(self, docx_filename, inputs, multiple_chapter_rule_list):
+        self.documents[docx_filename] = {
+            "inputs": inputs,
+            "multiple_chapter_rule_list": multiple_chapter_rule_list
+        }
+        self.save()
+
+    def hash_file(self, filepath):
+        """ Missing inputs (e.g. a scheme without a footnotes file) hash to None """
+        if filepath not in self.file_hashes:
+            if os.path.exists(filepath):
+                with open(filepath, "rb") as f:
+                    self.file_hashes[filepath] = hashlib.sha256(f.read()).hexdigest()
+            else:
+                self.file_hashes[filepath] = None
+        return self.file_hashes[filepath]
+
+    def hash_files(self, filepaths):
+        h = hashlib.sha256()
+        for filepath in filepaths:
+            h.update(os.path.basename(filepath).encode("utf-8"))
+            h.update((self.hash_file(filepath) or "").encode("utf-8"))
+        return h.hexdigest()
@@ -0,0 +1,183 @@
+import io
+import csv
+import json
+import heapq
+
+from classes.rule_lookup import RuleLookup
+
+BULK_FORMATS = ["ndjson", "csv"]
+HEADER_OPTIONS = ["auto", "yes", "no"]
+CSV_FIELDS = ["input", "code", "heading", "subdivision", "min", "max", "rule", "class", "operator"]
+CHUNK_SIZE = 64 * 1024
+
+
+def read_codes(f, column=None, header="auto"):
+    """
+    The codes in a CSV file (or any iterable of CSV lines): from the first column by default,
+    from the column at the given (0-based) index, or from the column with the given name, in
+    which case the first row is the header. Otherwise header says whether the first row is a
+    header: "yes", "no", or "auto", where it is taken to be one if its value is not a code.
+    Blank rows are skipped; a ValueError is raised for a row without the column.
+    """
+    if header not in HEADER_OPTIONS:
+        raise ValueError("The header option must be one of {options}".format(options=", ".join(HEADER_OPTIONS)))
+    reader = csv.reader(f)
+    rows = (row for row in reader if any(cell.strip() != "" for cell in row))
+    index = 0
+    if column is not None and str(column).isdigit():
+        index = int(column)
+    elif column is not None:
+        header_row = next(rows, [])
+        if column not in header_row:
+            raise ValueError("There is no column '{column}' in the header {header}".format(column=column, header=header_row))
+        index = header_row.index(column)
+        header = "no"
+
+    codes = []
+    for row in rows:
+        if len(row) <= index:
+            raise ValueError("Line {line} has no column {index}: {row}".format(line=reader.line_num, index=index, row=row))
+        code = row[index].strip()
+        is_header = header == "yes" or (header == "auto" and RuleLookup.normalize_code(code) is None)
+        header = "no"
+        if not is_header and code != "":
+            codes.append(code)
+    return codes
+
+
+def iter_chunks(lines, size=CHUNK_SIZE):
+    """ Joins the lines (as bytes) into chunks of roughly the given size, for writing """
+    chunk = []
+    length = 0
+    for line in lines:
+        chunk.append(line)
+        length += len(line)
+        if length >= size:
+            yield b"".join(chunk)
+            chunk = []
+            length = 0
+    if len(chunk) > 0:
+        yield b"".join(chunk)
+
+
+class BulkLookup(object):
+    """
+    Looks up a whole list of commodity codes under one agreement, from either a RuleLookup or a
+    BinaryRuleIndex.
+
+    Rather than searching the index for each code, the codes are sorted and merged against the
+    rule sets, which are already sorted by min, in one pass: as the codes rise, each rule set is
+    added to a heap (keyed by its max) once the codes reach its min, and dropped from the heap
+    once they pass its max, so that the heap holds exactly the rule sets that apply to the
+    current code. Codes that are the same as, or have the same rule sets as, the code before
+    them reuse its results, so each distinct set of rule sets is only encoded once.
+
+    Results come out in code order; codes given more than once are returned each time, and
+    anything that is not a commodity code is returned, with an error, after the rest.
+    """
+    def __init__(self, lookup):
+        self.lookup = lookup
+        self.mins, self.maxes = lookup.get_bounds()
+
+    def join(self, codes):
+        """ Yields (input, code, indexes) for each of the codes, where code is the 10-digit code
+        and indexes are as from find_indexes; code and indexes are None for invalid codes """
+        normalized_codes = []
+        invalid_codes = []
+        for code in codes:
+            normalized_code = RuleLookup.normalize_code(code)
+            if normalized_code is None:
+                invalid_codes.append(code)
+            else:
+                normalized_codes.append((normalized_code, code))
+        normalized_codes.sort()
+
+        active = []
+        entry = 0
+        count = len(self.mins)
+        previous_code = None
+        indexes = []
+        for normalized_code, code in normalized_codes:
+            if normalized_code != previous_code:
+                value = int(normalized_code)
+                changed = False
+                while entry < count and self.mins[entry] <= value:
+                    heapq.heappush(active, (self.maxes[entry], entry))
+                    entry += 1
+                    changed = True
+                while len(active) > 0 and active[0][0] < value:
+                    heapq.heappop(active)
+                    changed = True
+                if changed:
+                    indexes = self.lookup.order_indexes([active_entry for active_max, active_entry in active])
+                previous_code = normalized_code
+            yield code, normalized_code, indexes
+
+        for code in invalid_codes:
+            yield code, None, None
+
+    def iter_ndjson(self, codes):
+        """ One JSON object per line (as bytes) for each code: {"input": ..., "code": ...,
+        "rule_sets": [...]}, with the rule sets as they are in the export, or {"input": ...,
+        "error": ...} for anything that is not a commodity code """
+        previous_indexes = None
+        encoded_rule_sets = b"[]"
+        for code, normalized_code, indexes in self.join(codes):
+            if normalized_code is None:
+                yield json.dumps({"input": code, "error": "Not a commodity code"}).encode("utf-8") + b"\n"
+                continue
+            if indexes is not previous_indexes:
+                encoded_rule_sets = self.lookup.encode(indexes)
+                previous_indexes = indexes
+            # Valid codes are only ASCII digits, spaces and dots, so need no escaping
+            yield b'{"input":"' + code.encode("ascii") + b'","code":"' + normalized_code.encode("ascii") + b'","rule_sets":' + encoded_rule_sets + b"}\n"
+
+    def iter_csv(self, codes):
+        """ CSV lines (as bytes), after a header: a row for each rule that applies to each code,
+        or a single row with only the input and code for codes without any rules. Invalid codes
+        have a row with only the input """
+        yield self.format_csv_row(CSV_FIELDS).encode("utf-8")
+        previous_indexes = None
+        rows = []
+        for code, normalized_code, indexes in self.join(codes):
+            if normalized_code is None:
+                yield self.format_csv_row([code]).encode("utf-8")
+                continue
+            if indexes is not previous_indexes:
+                rows = self.get_csv_rows(self.lookup.get_rule_sets(indexes))
+                previous_indexes = indexes
+            # As with NDJSON, the input and the code need no quoting
+            prefix = (code + "," + normalized_code + ",").encode("ascii")
+            for row in rows:
+                yield prefix + row
+
+    @staticmethod
+    def format_csv_row(cells):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(cells)
+        return buffer.getvalue()
+
+    @classmethod
+    def get_csv_rows(cls, rule_sets):
+        """ The rules of the rule sets as CSV lines (as bytes), each without its input and code """
+        rows = []
+        for rule_set in rule_sets:
+            for rule in rule_set.get("rules", []):
+                rows.append(cls.format_csv_row([
+                    rule_set.get("heading", ""),
+                    rule_set.get("subdivision", ""),
+                    rule_set.get("min", ""),
+                    rule_set.get("max", ""),
+                    rule.get("rule", ""),
+                    ";".join(rule.get("class", [])),
+                    rule.get("operator") or ""
+                ]).encode("utf-8"))
+        if len(rows) == 0:
+            rows.append(cls.format_csv_row(["", "", "", "", "", "", ""]).encode("utf-8"))
+        return rows
+
+    def iter_format(self, codes, output_format):
+        """ The results in the given format (ndjson or csv), as chunks of bytes """
+        if output_format == "csv":
+            return iter_chunks(self.iter_csv(codes))
+        return iter_chunks(self.iter_ndjson(codes))
@@ -0,0 +1,71 @@
+import re
+import json
+
+
+class Corrections(object):
+    """
+    The corrections from corrections.json, compiled so that they can be applied to a string
+    in as few scans as possible.
+
+    The corrections are defined as an ordered list of plain text replacements, each of which
+    is applied to the output of the one before. Consecutive corrections that cannot interact
+    with each other are merged into a single stage, which applies all of them with one regular
+    expression scan. A correction starts a new stage when its 'from' text could overlap the
+    'from' or the 'to' text of a correction already in the current stage, as only then could
+    applying the corrections in sequence give a different result from applying them together.
+    """
+    def __init__(self, corrections):
+        self.corrections = corrections
+        self.compile()
+
+    @classmethod
+    def load(cls, filepath):
+        with open(filepath) as f:
+            return cls(json.load(f))
+
+    def compile(self):
+        grouped = []
+        for correction in self.corrections:
+            if len(grouped) == 0 or not self.can_join_stage(grouped[-1], correction):
+                grouped.append([])
+            grouped[-1].append(correction)
+
+        self.stages = []
+        for group in grouped:
+            replacements = {correction["from"]: correction["to"] for correction in group}
+            if len(group) == 1:
+                # A plain replace is quicker than a regular expression for a single correction
+                self.stages.append((None, replacements))
+            else:
+                pattern = re.compile("|".join(re.escape(correction["from"]) for correction in group))
+                self.stages.append((pattern, replacements))
+
+    def can_join_stage(self, stage, correction):
+        for earlier in stage:
+            if self.overlaps(earlier["from"], correction["from"]):
+                return False
+            if self.overlaps(earlier["to"], correction["from"]):
+                return False
+        return True
+
+    @staticmethod
+    def overlaps(a, b):
+        """ Whether an occurrence of b could share any characters with, or be created next to,
+        an occurrence of a """
+        if a == "" or b == "":
+            return True
+        if a in b or b in a:
+            return True
+        for length in range(1, min(len(a), len(b))):
+            if a.endswith(b[:length]) or b.endswith(a[:length]):
+                return True
+        return False
+
+    def apply(self, s):
+        for pattern, replacements in self.stages:
+            if pattern is None:
+                for old, new in replacements.items():
+                    s = s.replace(old, new)
+            else:
+                s = pattern.sub(lambda match: replacements[match.group(0)], s)
+        return s
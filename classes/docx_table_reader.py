@@ -0,0 +1,124 @@
+import zipfile
+import posixpath
+from lxml import etree
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PACKAGE_RELATIONSHIPS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+OFFICE_DOCUMENT_RELATIONSHIP = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+
+class DocxTableReader(object):
+    """
+    Reads the text of the top-level tables in a Word document straight from the document XML
+    in the docx package, without building the python-docx object model.
+
+    The document is parsed as a stream: each top-level table is converted into rows of cell text
+    as soon as it has been read and is then discarded, as are the paragraphs between the tables.
+
+    The rows and cell text are the same as python-docx gives from table.rows, row.cells and
+    cell.text: a cell spanning several grid columns appears once for each column, a vertically
+    merged cell repeats the cell above it, and the text of a cell is the text of each of its
+    paragraphs, separated by line breaks.
+    """
+    def __init__(self, docx_filepath):
+        self.docx_filepath = docx_filepath
+        self.tables = []
+        with zipfile.ZipFile(self.docx_filepath) as package:
+            with package.open(self.get_document_part_name(package)) as document_part:
+                self.read_tables(document_part)
+
+    def get_document_part_name(self, package):
+        """ The main document part is usually word/document.xml, but it is the package
+        relationships that say where it is """
+        relationships = etree.fromstring(package.read("_rels/.rels"))
+        for relationship in relationships.iterfind(PACKAGE_RELATIONSHIPS + "Relationship"):
+            if relationship.get("Type") == OFFICE_DOCUMENT_RELATIONSHIP:
+                return posixpath.normpath(relationship.get("Target").lstrip("/"))
+        return "word/document.xml"
+
+    def read_tables(self, document_part):
+        events = etree.iterparse(document_part, events=("end",), tag=(W + "tbl", W + "p", W + "sectPr"), remove_blank_text=True, resolve_entities=False)
+        for event, element in events:
+            parent = element.getparent()
+            if parent is None or parent.tag != W + "body":
+                # Paragraphs and tables within table cells are read with the table they belong to
+                continue
+            if element.tag == W + "tbl":
+                self.tables.append(self.read_table(element))
+
+            # Everything up to this point in the body has been read and is no longer needed
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+
+    def read_table(self, tbl):
+        tbl_grid = tbl.find(W + "tblGrid")
+        col_count = 0 if tbl_grid is None else len(tbl_grid.findall(W + "gridCol"))
+
+        # Lay out the cells of the table on its grid, in the same way as python-docx
+        cells = []
+        trs = tbl.findall(W + "tr")
+        for tr in trs:
+            for tc in tr.iterfind(W + "tc"):
+                grid_span, v_merge = self.get_cell_properties(tc)
+                for grid_span_index in range(grid_span):
+                    if v_merge == "continue":
+                        cells.append(cells[-col_count])
+                    elif grid_span_index > 0:
+                        cells.append(cells[-1])
+                    else:
+                        cells.append(self.get_cell_text(tc))
+
+        rows = []
+        for row_index in range(len(trs)):
+            rows.append(cells[row_index * col_count:(row_index + 1) * col_count])
+        return rows
+
+    @staticmethod
+    def get_cell_properties(tc):
+        """ Returns the number of grid columns the cell spans and its vertical merge setting;
+        a vMerge element without a value continues the merge from the cell above """
+        grid_span = 1
+        v_merge = None
+        tc_pr = tc.find(W + "tcPr")
+        if tc_pr is not None:
+            grid_span_element = tc_pr.find(W + "gridSpan")
+            if grid_span_element is not None:
+                grid_span = int(grid_span_element.get(W + "val"))
+            v_merge_element = tc_pr.find(W + "vMerge")
+            if v_merge_element is not None:
+                v_merge = v_merge_element.get(W + "val", "continue")
+        return grid_span, v_merge
+
+    def get_cell_text(self, tc):
+        return "\n".join(self.get_paragraph_text(p) for p in tc.iterfind(W + "p"))
+
+    def get_paragraph_text(self, p):
+        """ The text of the runs in the paragraph, including the runs within hyperlinks """
+        text = ""
+        for child in p:
+            if child.tag == W + "r":
+                text += self.get_run_text(child)
+            elif child.tag == W + "hyperlink":
+                for r in child.iterfind(W + "r"):
+                    text += self.get_run_text(r)
+        return text
+
+    @staticmethod
+    def get_run_text(r):
+        text = ""
+        for child in r:
+            tag = child.tag
+            if tag == W + "t":
+                text += child.text or ""
+            elif tag == W + "tab" or tag == W + "ptab":
+                text += "\t"
+            elif tag == W + "cr":
+                text += "\n"
+            elif tag == W + "br":
+                # Only line breaks count; page and column breaks have no text
+                if child.get(W + "type", "textWrapping") == "textWrapping":
+                    text += "\n"
+            elif tag == W + "noBreakHyphen":
+                text += "-"
+        return text
@@ -0,0 +1,196 @@
+import os
+import copy
+import json
+import gzip
+
+from classes.binary_index import serialize_binary_index
+from classes.environment_variable import EnvironmentVariable
+from classes.error import Error
+
+# The formats that can be written alongside the standard export. The standard, indented .json
+# export is always written, as the coverage checks and incremental batch builds rely on it
+EXPORT_FORMATS = ["compact", "rule_table", "rule_store", "binary_index", "gzip"]
+
+# The values that the compact format leaves out. A reader of the compact format must treat a
+# missing key as having the value given here
+RULE_SET_DEFAULTS = {
+    "valid": True
+}
+RULE_DEFAULTS = {
+    "footnotes": [],
+    "operator": None,
+    "quota": False,
+    "import": True,
+    "export": True
+}
+
+
+class ExportFormats(object):
+    """
+    Serializes a document's rule sets into each of the configured export formats:
+
+    - the standard export, e.g. albania.json, indented for readability (always written)
+    - compact: albania.compact.json, minified and without the keys whose values are the defaults
+      above; expand_compact turns it back into the standard structure
+    - rule_table: albania.rule_table.json, minified, with each distinct rule held once in a table
+      of rules and each rule set's rules given as indexes into the table; expand_rule_table turns
+      it back into the standard structure
+    - rule_store: written by batch.py rather than for each document (see classes/rule_store.py)
+    - binary_index: albania.index.bin, an index of the rule sets by their min and max, with the
+      rule sets themselves, that can be read through a memory map (see classes/binary_index.py)
+    - gzip: a gzip compressed copy of each of the JSON exports, e.g. albania.json.gz, so that they can be
+      served without compressing them on the fly. They are compressed without a timestamp, so the
+      same export always gives the same bytes
+    """
+    def __init__(self, formats):
+        self.formats = []
+        for export_format in formats:
+            if export_format not in EXPORT_FORMATS:
+                Error("Unknown export format '{export_format}'. The export formats are {export_formats}".format(
+                    export_format=export_format,
+                    export_formats=", ".join(EXPORT_FORMATS)
+                ), show_additional_information=False)
+            if export_format not in self.formats:
+                self.formats.append(export_format)
+
+    @classmethod
+    def from_environment(cls):
+        """ The export_formats environment variable is a comma-separated list of formats """
+        export_formats = EnvironmentVariable('export_formats', 'string', permit_omission=True).value
+        return cls([export_format.strip() for export_format in export_formats.split(",") if export_format.strip() != ""])
+
+    def serialize(self, export_filename, rule_set_object_list):
+        """ Returns the filename and content (as bytes) of each of the export files """
+        export_files = [(export_filename + ".json", self.serialize_standard(rule_set_object_list))]
+        if "compact" in self.formats:
+            export_files.append((export_filename + ".compact.json", self.serialize_compact(rule_set_object_list)))
+        if "rule_table" in self.formats:
+            export_files.append((export_filename + ".rule_table.json", self.serialize_rule_table(rule_set_object_list)))
+        export_files = self.compress(export_files)
+        if "binary_index" in self.formats:
+            export_files.append((export_filename + ".index.bin", serialize_binary_index(rule_set_object_list)))
+        return export_files
+
+    def get_filenames(self, export_filename):
+        """ The names of the export files that serialize returns for an export """
+        filenames = [export_filename + ".json"]
+        if "compact" in self.formats:
+            filenames.append(export_filename + ".compact.json")
+        if "rule_table" in self.formats:
+            filenames.append(export_filename + ".rule_table.json")
+        if "gzip" in self.formats:
+            filenames += [filename + ".gz" for filename in filenames]
+        if "binary_index" in self.formats:
+            filenames.append(export_filename + ".index.bin")
+        return filenames
+
+    def compress(self, export_files):
+        """ Adds the gzip compressed copies of the export files, if they are wanted """
+        if "gzip" in self.formats:
+            export_files += [(filename + ".gz", gzip.compress(content, compresslevel=9, mtime=0)) for filename, content in export_files]
+        return export_files
+
+    @staticmethod
+    def serialize_standard(rule_set_object_list):
+        return json.dumps({"rule_sets": rule_set_object_list}, indent=6).encode("utf-8")
+
+    @staticmethod
+    def serialize_compact(rule_set_object_list):
+        rule_sets = []
+        for rule_set in rule_set_object_list:
+            compact_rule_set = omit_defaults(rule_set, RULE_SET_DEFAULTS)
+            compact_rule_set["rules"] = [omit_defaults(rule, RULE_DEFAULTS) for rule in rule_set["rules"]]
+            rule_sets.append(compact_rule_set)
+        return json.dumps({"rule_sets": rule_sets}, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def serialize_rule_table(rule_set_object_list):
+        """ Rules are the same if their JSON is the same; the table is in order of first use """
+        rules = []
+        rule_ids = {}
+        rule_sets = []
+        for rule_set in rule_set_object_list:
+            table_rule_set = dict(rule_set)
+            table_rule_set["rules"] = []
+            for rule in rule_set["rules"]:
+                key = json.dumps(rule, sort_keys=True)
+                rule_id = rule_ids.get(key)
+                if rule_id is None:
+                    rule_id = len(rules)
+                    rule_ids[key] = rule_id
+                    rules.append(rule)
+                table_rule_set["rules"].append(rule_id)
+            rule_sets.append(table_rule_set)
+        return json.dumps({"rules": rules, "rule_sets": rule_sets}, separators=(",", ":")).encode("utf-8")
+
+
+def publish_export_files(export_files, export_folder, ott_prototype_path):
+    """ Publishes each export file to the export folder and, if one is configured, to the OTT
+    prototype folder """
+    for filename, content in export_files:
+        filepath = os.path.join(export_folder, filename)
+        publish_export_file(filepath, content)
+        if ott_prototype_path != "":
+            dest = os.path.join(ott_prototype_path, filename)
+            publish_export_file(dest, content, link_from=filepath)
+
+
+def publish_export_file(filepath, content, link_from=None):
+    """ Written to a temporary file and renamed into place, so that nothing reading the
+    folder ever sees a partially written export. Where the export has already been written
+    on the same file system, it is hard linked rather than written again """
+    temp_filepath = "{filepath}.{pid}.tmp".format(filepath=filepath, pid=os.getpid())
+    if os.path.exists(temp_filepath):
+        os.remove(temp_filepath)
+    linked = False
+    if link_from is not None:
+        try:
+            os.link(link_from, temp_filepath)
+            linked = True
+        except OSError:
+            # On a different file system, or one without hard links
+            pass
+    if not linked:
+        with open(temp_filepath, "wb") as f:
+            f.write(content)
+    os.replace(temp_filepath, filepath)
+
+
+def omit_defaults(item, defaults):
+    return {key: value for key, value in item.items() if key not in defaults or value != defaults[key]}
+
+
+def expand_compact(document):
+    """ Turns a compact export (as loaded from JSON) back into the standard structure. The keys
+    that were left out are added back at the end of each item, so only the key order differs """
+    rule_sets = []
+    for compact_rule_set in document["rule_sets"]:
+        rule_set = {}
+        for key, value in compact_rule_set.items():
+            if key == "rules":
+                rule_set[key] = [restore_defaults(rule, RULE_DEFAULTS) for rule in value]
+            else:
+                rule_set[key] = value
+        rule_sets.append(restore_defaults(rule_set, RULE_SET_DEFAULTS))
+    return {"rule_sets": rule_sets}
+
+
+def expand_rule_table(document):
+    """ Turns a rule table export (as loaded from JSON) back into the standard structure. Each
+    rule set gets its own copies of its rules, as it would from the standard export """
+    rules = document["rules"]
+    rule_sets = []
+    for table_rule_set in document["rule_sets"]:
+        rule_set = dict(table_rule_set)
+        rule_set["rules"] = [copy.deepcopy(rules[rule_id]) for rule_id in table_rule_set["rules"]]
+        rule_sets.append(rule_set)
+    return {"rule_sets": rule_sets}
+
+
+def restore_defaults(item, defaults):
+    restored = dict(item)
+    for key, value in defaults.items():
+        if key not in restored:
+            # Copied, so that the default lists are never shared between items
+            restored[key] = copy.copy(value)
+    return restored
@@ -25,6 +25,28 @@ def range_matches_heading(my_range, my_heading):
     return matched
 
 
+def get_export_filename(docx_filename):
+    """ Derives the name of the export (without extension) from the name of the source document,
+    e.g. "South Korea PSR.docx" becomes "south-korea" """
+    export_filename = docx_filename.replace(".docx", "").replace(" ", "-").lower()
+    export_filename = export_filename.replace("_psr", "")
+    export_filename = export_filename.replace("-psr", "")
+    return export_filename
+
+
+def get_agreement_name(filename, extension=".json"):
+    """ The agreement that a file in the export folder is the standard export of (or, with the
+    extension ".index.bin", the binary index of), e.g. "south-korea" for "south-korea.json",
+    or None for any other file: the other export formats are named "<scheme>.<format>.json",
+    and the rule store shared by all of the agreements is rule-store.json """
+    if not filename.endswith(extension):
+        return None
+    name = filename[:-len(extension)]
+    if "." in name or name == "rule-store":
+        return None
+    return name
+
+
 def to_integer(s):
     try:
         i = int(s)
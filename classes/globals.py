@@ -1,22 +1,7 @@
 from os import system, name
 
 
-all_headings = {}
-all_subheadings = {}
-all_codes = {}
-all_rules_with_classes = {}
-mix_ex_non_ex_errors = []
-non_contiguous_and_errors = []
-multiple_and_errors = []
-multiple_manufacture = []
-possible_missing_hyphens = []
-
-parent_heading = ""
-docx_filename = ""
-multiple_chapter_rule_list = []
-residual_added = []
 hierarchy_divider = " ▸ "
-rule_ends_with_or = []
 
 def format_parts(s, index):
     s = s.strip()
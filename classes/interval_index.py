@@ -0,0 +1,35 @@
+import bisect
+
+
+class IntervalIndex(object):
+    """
+    A sorted index over the min / max commodity code ranges of a set of rule sets, used to find
+    out whether a commodity code is covered by any rule set without scanning all of them.
+
+    Codes are compared as strings, in the same way that they are compared in the export.
+    Overlapping ranges are merged, so that the index holds a sorted list of disjoint ranges and
+    each look-up is a single binary search.
+    """
+    def __init__(self, intervals):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(interval for interval in intervals if interval[0] <= interval[1]):
+            if len(self.ends) > 0 and start <= self.ends[-1]:
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    @classmethod
+    def from_rule_sets(cls, rule_sets):
+        """ Rule sets without a valid (string) min and max cannot cover any code """
+        intervals = []
+        for rule_set in rule_sets:
+            if isinstance(rule_set.min, str) and isinstance(rule_set.max, str):
+                intervals.append((rule_set.min, rule_set.max))
+        return cls(intervals)
+
+    def covers(self, code):
+        index = bisect.bisect_right(self.starts, code) - 1
+        return index >= 0 and code <= self.ends[index]
@@ -0,0 +1,59 @@
+import numpy as np
+
+# Codes from chapter 98 upwards are not expected to be covered by any agreement
+LEAF_COVERAGE_CEILING = 9800000000
+
+
+class LeafCoverage(object):
+    """
+    Checks every 10-digit commodity code leaf against the min / max ranges of a document's rule
+    sets, as arrays, so that the full code list can be checked in a fraction of a second.
+
+    The ranges are sorted by their min, alongside a running maximum of their max values: a code
+    is covered if the running maximum at the last range starting at or before the code reaches
+    the code. Rule sets whose min or max is not a 10-digit code cannot cover anything; they are
+    reported by the min max validation instead.
+    """
+    def __init__(self, leaf_code_array):
+        self.leaf_codes = leaf_code_array[leaf_code_array < LEAF_COVERAGE_CEILING]
+
+    def get_bounds(self, rule_sets):
+        mins = []
+        maxes = []
+        for rule_set in rule_sets:
+            if self.is_leaf_code(rule_set.min) and self.is_leaf_code(rule_set.max):
+                mins.append(int(rule_set.min))
+                maxes.append(int(rule_set.max))
+
+        mins = np.array(mins, dtype=np.int64)
+        maxes = np.array(maxes, dtype=np.int64)
+        order = np.argsort(mins, kind="stable")
+        return mins[order], np.maximum.accumulate(maxes[order]) if len(order) > 0 else maxes
+
+    @staticmethod
+    def is_leaf_code(code):
+        return isinstance(code, str) and len(code) == 10 and code.isdigit()
+
+    def get_covered(self, rule_sets):
+        """ A boolean array, holding whether each leaf code is covered """
+        mins, running_maxes = self.get_bounds(rule_sets)
+        if len(mins) == 0:
+            return np.zeros(len(self.leaf_codes), dtype=bool)
+        index = np.searchsorted(mins, self.leaf_codes, side="right") - 1
+        return (index >= 0) & (self.leaf_codes <= running_maxes[np.maximum(index, 0)])
+
+    def find_gaps(self, rule_sets):
+        """ The uncovered leaf codes, as runs of consecutive leaves in the code list, each given
+        as a tuple of its first code, its last code and the number of leaves in it """
+        uncovered = ~self.get_covered(rule_sets)
+        edges = np.diff(np.concatenate(([False], uncovered, [False])).astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        gaps = []
+        for start, end in zip(starts, ends):
+            gaps.append((self.format_code(self.leaf_codes[start]), self.format_code(self.leaf_codes[end - 1]), int(end - start)))
+        return gaps
+
+    @staticmethod
+    def format_code(code):
+        return "{code:010d}".format(code=int(code))
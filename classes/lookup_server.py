@@ -0,0 +1,147 @@
+import io
+import json
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from classes.rule_lookup import RuleLookup
+from classes.bulk_lookup import BulkLookup, BULK_FORMATS, read_codes
+
+
+class LookupRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers lookups of the rule sets that apply to a commodity code under an agreement:
+
+    - GET /lookup?agreement=albania&code=0101210000 - the rule sets, as in the export
+    - GET /agreements - the agreements that are loaded
+    - POST /bulk?agreement=albania&format=ndjson - the rule sets for every code in the CSV body
+      (see BulkLookup), streamed back as NDJSON or CSV; column= and header= are as for read_codes
+
+    Connections are kept alive between requests, and the rule sets are encoded as JSON only the
+    first time that they are returned.
+    """
+    protocol_version = "HTTP/1.1"
+    # Responses are written as headers then body, which would otherwise wait on the client's
+    # delayed acknowledgement of the headers
+    disable_nagle_algorithm = True
+    server_version = "RooLookup"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/lookup":
+            self.lookup(parse_qs(url.query))
+        elif url.path == "/agreements":
+            self.send_json(200, json.dumps({"agreements": self.server.agreement_lookup.get_agreements()}).encode("utf-8"))
+        else:
+            self.send_error_json(404, "Not found")
+
+    def lookup(self, query):
+        agreement = query.get("agreement", [""])[0]
+        code = RuleLookup.normalize_code(query.get("code", [""])[0])
+        lookup = self.server.agreement_lookup.get_lookup(agreement)
+        if lookup is None:
+            self.send_error_json(404, "Unknown agreement '{agreement}'".format(agreement=agreement))
+        elif code is None:
+            self.send_error_json(400, "The code must be a commodity code of up to 10 digits")
+        else:
+            rule_sets = lookup.encode(lookup.find_indexes(code))
+            body = '{{"agreement":{agreement},"code":"{code}","rule_sets":'.format(
+                agreement=json.dumps(agreement),
+                code=code
+            ).encode("utf-8") + rule_sets + b"}"
+            self.send_json(200, body)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self.read_body()
+        if body is None:
+            return
+        if url.path == "/bulk":
+            self.bulk(parse_qs(url.query), body)
+        else:
+            self.send_error_json(404, "Not found")
+
+    def read_body(self):
+        """ The request body, whether sent with a Content-Length or chunked. Returns None, having
+        sent an error response, if neither can be read """
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            return self.read_chunked_body()
+        content_length = self.headers.get("Content-Length", "0").strip()
+        if not content_length.isascii() or not content_length.isdigit():
+            self.close_connection = True
+            self.send_error_json(400, "The Content-Length must be a number of bytes")
+            return None
+        return self.rfile.read(int(content_length))
+
+    def read_chunked_body(self):
+        """ The chunks of the body, each a size in hex digits (and any extensions) on its own line,
+        then that many bytes and a CRLF, up to a chunk of size 0. Returns None, having sent an
+        error response, if the body does not follow that format """
+        chunks = []
+        while True:
+            size_line = self.rfile.readline(65537).split(b";")[0].strip()
+            if size_line == b"" or not all(c in b"0123456789abcdefABCDEF" for c in size_line):
+                return self.send_malformed_body()
+            size = int(size_line, 16)
+            if size == 0:
+                break
+            chunk = self.rfile.read(size)
+            if len(chunk) < size or self.rfile.readline(65537) != b"\r\n":
+                return self.send_malformed_body()
+            chunks.append(chunk)
+        # Trailers, up to the blank line that ends the body
+        while self.rfile.readline(65537).strip() != b"":
+            pass
+        return b"".join(chunks)
+
+    def send_malformed_body(self):
+        self.close_connection = True
+        self.send_error_json(400, "The chunked request body is malformed")
+        return None
+
+    def bulk(self, query, body):
+        agreement = query.get("agreement", [""])[0]
+        output_format = query.get("format", ["ndjson"])[0]
+        lookup = self.server.agreement_lookup.get_lookup(agreement)
+        if lookup is None:
+            self.send_error_json(404, "Unknown agreement '{agreement}'".format(agreement=agreement))
+            return
+        if output_format not in BULK_FORMATS:
+            self.send_error_json(400, "The format must be one of {formats}".format(formats=", ".join(BULK_FORMATS)))
+            return
+        try:
+            codes = read_codes(io.StringIO(body.decode("utf-8"), newline=""), query.get("column", [None])[0], query.get("header", ["auto"])[0])
+        except (UnicodeDecodeError, ValueError) as e:
+            self.send_error_json(400, str(e))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson" if output_format == "ndjson" else "text/csv")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in BulkLookup(lookup).iter_format(codes, output_format):
+            self.wfile.write("{length:x}\r\n".format(length=len(chunk)).encode("ascii") + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def send_error_json(self, status, message):
+        self.send_json(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def send_json(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class LookupServer(ThreadingHTTPServer):
+    """ A local HTTP server for rule lookups, answering each connection on its own thread """
+    daemon_threads = True
+
+    def __init__(self, address, agreement_lookup, quiet=False):
+        self.agreement_lookup = agreement_lookup
+        self.quiet = quiet
+        ThreadingHTTPServer.__init__(self, address, LookupRequestHandler)
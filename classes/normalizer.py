@@ -3,6 +3,9 @@ import re
 import unicodedata
 
 
+#: Runs of two to ten spaces, which are collapsed to a single space.
+MULTIPLE_SPACES = re.compile(" {2,10}")
+
 #: Control characters.
 CONTROLS = {'\u0001', '\u0002', '\u0003', '\u0004', '\u0005', '\u0006', '\u0007', '\u0008'}
 
@@ -241,71 +244,90 @@ class Normalizer(BaseNormalizer):
         self.ellipsis = ellipsis
         self.slashes = slashes
         self.tildes = tildes
+        self.compile()
+
+    def compile(self):
+        """Build the translation tables used for the single character mappings.
+
+        Each table is applied in one pass with str.translate. None of the characters that a table
+        produces is mapped again by the same table, so a table gives the same result as applying
+        its mappings one after another.
+        """
+        # Control characters, unusual whitespace not caught by unicodedata, dashes and quotes.
+        # Line and paragraph separators become newlines here, before carriage returns are dealt
+        # with, as they were when each of these was replaced in turn.
+        self.whitespace_table = str.maketrans({
+            **{control: None for control in CONTROLS},
+            '\u000b': ' ',
+            '\u0085': ' ',
+            '\u2028': '\n',
+            '\u2029': '\n',
+            '\xa0': ' ',
+            '\t': ' ',
+            '\u2013': '-',
+            '\u2018': "'",
+            '\u2019': "'",
+            '\u201c': '"',
+            '\u201d': '"',
+        })
+
+        # Normalize all hyphens, minuses and dashes to ascii hyphen-minus and remove soft hyphen entirely
+        self.hyphens_table = str.maketrans({
+            **{hyphen: '-' for hyphen in HYPHENS | MINUSES},
+            '\u00ad': None
+        })
+
+        # Normalize all quotes and primes to ascii apostrophe and quotation mark
+        self.quotes_table = str.maketrans({
+            **{double_quote: '"' for double_quote in DOUBLE_QUOTES},
+            **{single_quote: "'" for single_quote in (SINGLE_QUOTES | APOSTROPHES | ACCENTS)},
+            '′': "'",           # \u2032 prime
+            '‵': "'",           # \u2035 reversed prime
+            '″': "''",          # \u2033 double prime
+            '‶': "''",          # \u2036 reversed double prime
+            '‴': "'" * 3,       # \u2034 triple prime
+            '‷': "'" * 3,       # \u2037 reversed triple prime
+            '⁗': "'" * 4,       # \u2057 quadruple prime
+        })
+
+        self.slashes_table = str.maketrans({slash: '/' for slash in SLASHES})
+        self.tildes_table = str.maketrans({tilde: '~' for tilde in TILDES})
 
     def normalize(self, text):
         """Run the Normalizer on a string.
 
         :param text: The string to normalize.
         """
-        # Normalize to canonical unicode (using NFKC by default)
-        if self.form is not None:
+        # Normalize to canonical unicode (using NFKC by default); ASCII text is already normalized
+        if self.form is not None and not text.isascii():
             text = unicodedata.normalize(self.form, text)
 
-        # Strip out any control characters (they occasionally creep in somehow)
-        for control in CONTROLS:
-            text = text.replace(control, '')
-
-        # Normalize unusual whitespace not caught by unicodedata
-        # text = text.replace('\u000b', ' ').replace('\u000c', ' ').replace(u'\u0085', ' ')
-        text = text.replace('\u000b', ' ').replace(u'\u0085', ' ')
-        text = text.replace('\u2028', '\n').replace('\u2029', '\n').replace('\r\n', '\n').replace('\r', '\n')
-        text = text.replace(u'\xa0', u' ')
-        text = re.sub("\t", " ", text)
-        text = re.sub(" {2,10}", " ", text)
+        # Strip out any control characters (they occasionally creep in somehow) and normalize
+        # unusual whitespace, dashes and quotes
+        text = text.translate(self.whitespace_table)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        if '  ' in text:
+            text = MULTIPLE_SPACES.sub(" ", text)
         for i in range(1, 4):
-            text = re.sub("\n\n", "\n", text)
-        # text = re.sub("\n", "<br>", text)
-
-        text = text.replace(u'\u2013', u'-')
-        text = text.replace(u'\u2018', u"'")
-
-        text = text.replace('”', '"')
-        text = text.replace('“', '"')
+            if '\n\n' not in text:
+                break
+            text = text.replace("\n\n", "\n")
 
-        text = text.replace("‘", "'")
-        text = text.replace("’", "'")
-
-        # Normalize all hyphens, minuses and dashes to ascii hyphen-minus and remove soft hyphen entirely
         if self.hyphens:
-            # TODO: Better normalization of em/en dashes to '--' if surrounded by spaces or start/end?
-            for hyphen in HYPHENS | MINUSES:
-                text = text.replace(hyphen, '-')
-            text = text.replace('\u00ad', '')
+            text = text.translate(self.hyphens_table)
 
-        # Normalize all quotes and primes to ascii apostrophe and quotation mark
         if self.quotes:
-            for double_quote in DOUBLE_QUOTES:
-                text = text.replace(double_quote, '"')  # \u0022
-            for single_quote in (SINGLE_QUOTES | APOSTROPHES | ACCENTS):
-                text = text.replace(single_quote, "'")  # \u0027
-            text = text.replace('′', "'")     # \u2032 prime
-            text = text.replace('‵', "'")     # \u2035 reversed prime
-            text = text.replace('″', "''")    # \u2033 double prime
-            text = text.replace('‶', "''")    # \u2036 reversed double prime
-            text = text.replace('‴', "'''")   # \u2034 triple prime
-            text = text.replace('‷', "'''")   # \u2037 reversed triple prime
-            text = text.replace('⁗', "''''")  # \u2057 quadruple prime
+            text = text.translate(self.quotes_table)
 
         if self.ellipsis:
             text = text.replace('…', '...').replace(' . . . ', ' ... ')  # \u2026
 
         if self.slashes:
-            for slash in SLASHES:
-                text = text.replace(slash, '/')
+            text = text.translate(self.slashes_table)
 
         if self.tildes:
-            for tilde in TILDES:
-                text = text.replace(tilde, '~')
+            text = text.translate(self.tildes_table)
 
         if self.strip:
             text = text.strip()
@@ -322,3 +344,5 @@ class Normalizer(BaseNormalizer):
 normalize = Normalizer(strip=True, collapse=True, hyphens=False, quotes=False, ellipsis=False)
 #: More aggressive normalize that also standardizes hyphens, and quotes.
 strict_normalize = Normalizer(strip=True, collapse=True, hyphens=True, quotes=True, ellipsis=True, tildes=True)
+#: Normalize used for the text in the cells of the PSR table, which canonicalizes unicode, fixes whitespace and strips.
+cell_normalize = Normalizer()
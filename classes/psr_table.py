@@ -0,0 +1,142 @@
+MODERN_RENAME_KEYS = {
+    "Classification": "original_heading",
+    "PSR": "original_rule"
+}
+MODERN_REQUIRED_KEYS = ["original_heading", "original_rule"]
+
+LEGACY_RENAME_KEYS = {
+    "Heading": "original_heading",
+    "Classification": "original_heading",
+    "Description": "description",
+    "Description of goods": "description",
+    "Conditions": "original_rule",
+    "PSR": "original_rule",
+    "PSR2": "original_rule2"
+}
+LEGACY_REQUIRED_KEYS = ["original_heading", "description", "original_rule", "original_rule2"]
+
+
+class PsrTable(object):
+    """
+    Extracts the rows of the PSR table from the document in a single pass, collecting the
+    structural and heading diagnostics that the table checks report on as it goes, so that
+    the checks do not need to walk the table again:
+
+    - the number of tables in the document
+    - the first row with an empty first cell or with more than four cells, and the distinct
+      numbers of cells in each row of the table
+    - the first row record with more than four columns
+    - the row records whose heading is empty, uses ex more than once, mixes conjunctions or
+      has more than one comma
+    """
+    def __init__(self, tables, modern):
+        self.table_count = len(tables)
+        self.modern = modern
+        if self.modern:
+            self.rename_keys = MODERN_RENAME_KEYS
+            self.required_keys = MODERN_REQUIRED_KEYS
+        else:
+            self.rename_keys = LEGACY_RENAME_KEYS
+            self.required_keys = LEGACY_REQUIRED_KEYS
+
+        # Structure of the table in the document
+        self.first_cell_error = None
+        self.cell_counts = set()
+
+        # Row records and their diagnostics
+        self.rows = []
+        self.oversized_row_length = None
+        self.empty_rows = []
+        self.double_ex_rows = []
+        self.mixed_conjunctions = []
+        self.more_than_one_comma = []
+
+        if self.table_count > 0:
+            self.extract(tables[0])
+
+    def extract(self, table):
+        keys = None
+        cell_previous = "UNSPECIFIED"
+        last_valid_heading = ""
+        for i, row in enumerate(table):
+            first_cell = row[0].strip() if len(row) > 0 else ""
+            self.check_cells(first_cell, len(row), cell_previous)
+            cell_previous = first_cell
+
+            # The first row holds the headers, which become the keys of each row's dictionary
+            if i == 0:
+                keys = tuple(row)
+                continue
+
+            item = dict(zip(keys, row))
+            if item == {}:
+                continue
+            for old_key in self.rename_keys:
+                if old_key in item.keys():
+                    new_key = self.rename_keys[old_key]
+                    item[new_key] = item.pop(old_key)
+
+            if self.oversized_row_length is None and len(item) > 4:
+                self.oversized_row_length = len(item)
+            if "original_heading" in item:
+                last_valid_heading = self.check_heading(item["original_heading"], len(self.rows), last_valid_heading)
+            self.rows.append(item)
+
+    def check_cells(self, first_cell, cell_count, cell_previous):
+        """ Only the first empty first cell or oversized row is reported """
+        self.cell_counts.add(cell_count)
+        if self.first_cell_error is None:
+            if first_cell == "":
+                self.first_cell_error = ("empty", cell_previous)
+            elif cell_count > 4:
+                self.first_cell_error = ("columns", cell_previous)
+
+    def check_heading(self, original_heading, row_index, last_valid_heading):
+        original_heading = original_heading.replace(";", ",")
+        original_heading = original_heading.replace(u'\xa0', u' ')
+        original_heading = original_heading.replace("ex ex", "ex")
+
+        if original_heading == "":
+            self.empty_rows.append((row_index, last_valid_heading))
+        else:
+            last_valid_heading = original_heading
+
+        if self.is_double_ex(original_heading):
+            self.double_ex_rows.append((row_index, last_valid_heading))
+
+        if self.has_mixed_conjunctions(original_heading):
+            self.mixed_conjunctions.append((row_index, last_valid_heading))
+
+        if self.has_more_than_one_comma(original_heading):
+            self.more_than_one_comma.append((row_index, last_valid_heading))
+
+        return last_valid_heading
+
+    def is_valid(self):
+        """ The first row must have all of the required columns """
+        sample_table_row = self.rows[0]
+        for required_key in self.required_keys:
+            if required_key not in sample_table_row.keys():
+                return False
+        return True
+
+    @staticmethod
+    def is_double_ex(s):
+        return s.count("ex") > 1
+
+    @staticmethod
+    def has_more_than_one_comma(s):
+        return s.count(",") > 1
+
+    @staticmethod
+    def has_mixed_conjunctions(s):
+        conjunction_count = 0
+        if "," in s:
+            conjunction_count += 1
+        if "to" in s:
+            conjunction_count += 1
+        if "-" in s:
+            conjunction_count += 1
+        if "and" in s:
+            conjunction_count += 1
+        return conjunction_count > 1
@@ -0,0 +1,158 @@
+import os
+import json
+import csv
+import hashlib
+import pickle
+import numpy as np
+
+from classes.environment_variable import EnvironmentVariable
+from classes.corrections import Corrections
+from classes.tariff_hierarchy import TariffHierarchy
+
+# Increment this whenever the structure of the compiled code list cache changes
+CODE_LIST_CACHE_VERSION = 2
+
+
+class ReferenceData(object):
+    """
+    The reference data shared by every document build: the rule classes from the XI tariff,
+    the headings, subheadings and codes from the commodity code list and the text corrections. This data does not
+    change during a run, so it is loaded once per process and must be treated as read-only.
+    """
+    def __init__(self, all_rules_path, code_list_path):
+        self.all_rules_path = all_rules_path
+        self.code_list_path = code_list_path
+        self.load_all_rules_with_classes()
+        self.load_commodities()
+        self.load_corrections()
+
+    def load_all_rules_with_classes(self):
+        """ Pull in a list of all of the rules from the XI tariff and the classes of rule
+        that are associated with each of these. """
+        with open(self.all_rules_path) as f:
+            self.all_rules_with_classes = json.load(f)
+
+    def load_corrections(self):
+        """ Load and compile the corrections that are applied to rules and subdivisions """
+        corrections_file = os.path.join(os.getcwd(), "resources", "data", "corrections.json")
+        self.corrections = Corrections.load(corrections_file)
+
+    def load_commodities(self):
+        """ Retrieve all of the commodity codes (latest version) from the CSV code list. Deriving
+        the tariff hierarchy from the CSV is comparatively slow, so the results are kept in a
+        compiled cache which is only rebuilt when the code list itself changes. """
+        cache_key = self.get_code_list_cache_key()
+        cached = self.read_code_list_cache(cache_key)
+        if cached is None:
+            cached = self.parse_commodities()
+            cached["key"] = cache_key
+            self.write_code_list_cache(cached)
+
+        self.all_headings = cached["all_headings"]
+        self.all_subheadings = cached["all_subheadings"]
+        self.all_codes = cached["all_codes"]
+        self.all_leaf_codes = cached["all_leaf_codes"]
+        self.leaf_code_array = cached["leaf_code_array"]
+        self.tariff_hierarchy = TariffHierarchy(self.all_headings, self.all_subheadings, self.all_leaf_codes)
+
+    def parse_commodities(self):
+        """ Reads the CSV code list and derives the headings, the subheadings, the first
+        commodity code of each heading and the full, sorted list of commodity (leaf) codes, which
+        is also held as an array of integers for the leaf coverage check """
+        all_headings = {}
+        all_subheadings = {}
+        all_codes = []
+        all_leaf_codes = set()
+        found_headings = set()
+        with open(self.code_list_path) as csv_file:
+            csv_reader = csv.DictReader(csv_file)
+            for row in csv_reader:
+                code = row["Commodity code"]
+                if row["Class"] == "commodity":
+                    all_leaf_codes.add(code)
+                    if code[0:4] not in found_headings:
+                        found_headings.add(code[0:4])
+                        all_codes.append(code)
+
+                if code.endswith("000000"):
+                    if not code.endswith("00000000"):
+                        all_headings[code[0:4]] = row["Description"]
+                elif code.endswith("0000"):
+                    all_subheadings[code[0:6]] = row["Description"]
+
+        all_leaf_codes = sorted(all_leaf_codes)
+        return {
+            "all_headings": all_headings,
+            "all_subheadings": all_subheadings,
+            "all_codes": all_codes,
+            "all_leaf_codes": all_leaf_codes,
+            "leaf_code_array": np.fromiter((int(code) for code in all_leaf_codes), dtype=np.int64, count=len(all_leaf_codes))
+        }
+
+    def get_code_list_cache_key(self):
+        """ The cache is keyed on the path, size and content of the code list """
+        with open(self.code_list_path, "rb") as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        return {
+            "path": os.path.abspath(self.code_list_path),
+            "size": os.path.getsize(self.code_list_path),
+            "sha256": content_hash,
+            "version": CODE_LIST_CACHE_VERSION
+        }
+
+    def get_code_list_cache_filepath(self):
+        path_hash = hashlib.sha1(os.path.abspath(self.code_list_path).encode("utf-8")).hexdigest()[0:12]
+        return os.path.join(os.getcwd(), "resources", "temp", "cache", "commodities-" + path_hash + ".pickle")
+
+    def read_code_list_cache(self, cache_key):
+        filepath = self.get_code_list_cache_filepath()
+        if not os.path.exists(filepath):
+            return None
+        try:
+            with open(filepath, "rb") as f:
+                cached = pickle.load(f)
+        except Exception:
+            return None
+        if cached.get("key") != cache_key:
+            return None
+        return cached
+
+    def write_code_list_cache(self, cached):
+        """ Written to a temporary file and renamed into place, so that parallel builds
+        never see a partially written cache """
+        filepath = self.get_code_list_cache_filepath()
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        temp_filepath = "{filepath}.{pid}.tmp".format(filepath=filepath, pid=os.getpid())
+        with open(temp_filepath, "wb") as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_filepath, filepath)
+
+
+_reference_data = {}
+
+
+def get_reference_data_paths():
+    """ Work out where the rule classes and the commodity code list are stored. If the files
+    specified in the environment variables do not exist, then the default files, which exist
+    within this repository, are used instead. """
+    defaults_folder = os.path.join(os.getcwd(), "resources", "defaults")
+
+    all_rules_path = EnvironmentVariable('all_rules_path', 'string', permit_omission=True).value
+    if not os.path.exists(all_rules_path):
+        all_rules_path = os.path.join(defaults_folder, "all_rules.json")
+
+    code_list_path = EnvironmentVariable('preferred_code_list_file', 'string', permit_omission=True).value
+    if not os.path.exists(code_list_path):
+        code_list_path = os.path.join(defaults_folder, "uk_commodities_2023-10-23.csv")
+
+    return all_rules_path, code_list_path
+
+
+def get_reference_data():
+    """ Returns the reference data for this process, loading it on first use. Worker processes
+    forked after the first call share the parent's copy rather than loading their own. """
+    key = get_reference_data_paths()
+    if key not in _reference_data:
+        _reference_data[key] = ReferenceData(*key)
+
+    return _reference_data[key]
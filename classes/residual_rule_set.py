@@ -0,0 +1,58 @@
+from classes.rule_set_legacy import RuleSetLegacy
+
+
+class ResidualRuleSet(object):
+    """
+    The residual rule that a heading inherits from a whole chapter rule set: a view onto the
+    chapter rule set that holds its own values only for the attributes that residual rules
+    change (the min and max, headings, subdivision and so on), and reads everything else from
+    the chapter rule set. The heading and rules, which are compared when merging contiguous
+    rules, are also held by the view, though they are the chapter rule set's own.
+
+    Each heading that inherits the chapter rules gets its own view, but the chapter rule set and
+    its rules are shared between them rather than copied for every heading. A view has nowhere
+    to put any other attribute, so setting one can never change the chapter rule set. The rule
+    set is only turned into a dictionary of its own when it is serialized, with as_dict.
+    """
+    __slots__ = (
+        "rule_set", "heading", "rules", "min", "max", "headings", "subheadings", "subdivision",
+        "is_chapter", "is_heading", "sort_index", "mark_for_deletion",
+    )
+
+    def __init__(self, rule_set):
+        self.rule_set = rule_set
+        self.heading = rule_set.heading
+        self.rules = rule_set.rules
+        self.min = rule_set.min
+        self.max = rule_set.max
+        self.headings = rule_set.headings
+        self.subheadings = rule_set.subheadings
+        self.subdivision = rule_set.subdivision
+        self.is_chapter = rule_set.is_chapter
+        self.is_heading = rule_set.is_heading
+        self.sort_index = rule_set.sort_index
+        self.mark_for_deletion = rule_set.mark_for_deletion
+
+    def __getattr__(self, name):
+        # Only called for the attributes that the view does not hold itself
+        return getattr(self.rule_set, name)
+
+    def __copy__(self):
+        """ A copy of a view is another view onto the same chapter rule set """
+        duplicate = ResidualRuleSet.__new__(ResidualRuleSet)
+        duplicate.rule_set = self.rule_set
+        duplicate.heading = self.heading
+        duplicate.rules = self.rules
+        duplicate.min = self.min
+        duplicate.max = self.max
+        duplicate.headings = self.headings
+        duplicate.subheadings = self.subheadings
+        duplicate.subdivision = self.subdivision
+        duplicate.is_chapter = self.is_chapter
+        duplicate.is_heading = self.is_heading
+        duplicate.sort_index = self.sort_index
+        duplicate.mark_for_deletion = self.mark_for_deletion
+        return duplicate
+
+    as_dict = RuleSetLegacy.as_dict
+    __eq__ = RuleSetLegacy.__eq__
@@ -0,0 +1,54 @@
+import re
+
+
+class Replace(object):
+    """ A plain text replacement, equivalent to str.replace """
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+    def apply(self, s):
+        return s.replace(self.old, self.new)
+
+
+class Substitute(object):
+    """
+    A regular expression substitution, compiled once. The guard is a literal (or a tuple of
+    literals) that must appear in the text for the pattern to be able to change it; when none
+    of them do, the substitution is skipped without running the pattern at all.
+    A repeat count greater than one re-applies the substitution, to pick up matches that
+    overlapped the previous pass, stopping early once a pass makes no change.
+    """
+    def __init__(self, pattern, replacement, guard=None, repeat=1):
+        self.pattern = re.compile(pattern)
+        self.replacement = replacement
+        if guard is None or isinstance(guard, tuple):
+            self.guards = guard
+        else:
+            self.guards = (guard,)
+        self.repeat = repeat
+
+    def apply(self, s):
+        if self.guards is not None:
+            for guard in self.guards:
+                if guard in s:
+                    break
+            else:
+                return s
+
+        for i in range(self.repeat):
+            s, count = self.pattern.subn(self.replacement, s)
+            if count == 0:
+                break
+        return s
+
+
+class RewriteTable(object):
+    """ An ordered table of rewrites, applied one after another """
+    def __init__(self, steps):
+        self.steps = steps
+
+    def apply(self, s):
+        for step in self.steps:
+            s = step.apply(s)
+        return s
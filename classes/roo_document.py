@@ -2,16 +2,19 @@ import sys
 import os
 import copy
 import json
-import shutil
-import csv
 from dotenv import load_dotenv
-from docx.api import Document
 
+from classes.docx_table_reader import DocxTableReader
+from classes.psr_table import PsrTable
 from classes.rule_set_modern import RuleSetModern
 from classes.rule_set_legacy import RuleSetLegacy
 from classes.rule_set_chapter import RuleSetChapter
-from classes.comm_code_validator import CommCodeValidator
+from classes.interval_index import IntervalIndex
+from classes.leaf_coverage import LeafCoverage
 from classes.environment_variable import EnvironmentVariable
+from classes.export_formats import ExportFormats, publish_export_files
+from classes.build_context import BuildContext
+from classes.reference_data import get_reference_data
 from classes.error import Error
 from classes.warning import Warning
 import classes.globals as g
@@ -19,15 +22,18 @@ import classes.functions as func
 
 
 class RooDocument(object):
-    def __init__(self, psr_source_file=None):
-        g.rule_ends_with_or = []
+    def __init__(self, psr_source_file=None, context=None, reference_data=None):
         self.psr_source_file = psr_source_file
+        self.context = context if context is not None else BuildContext()
+        self.reference_data = reference_data if reference_data is not None else get_reference_data()
         self.get_config()
         self.get_footnotes()
         self.get_all_rules_with_classes()
+        self.get_corrections()
         self.get_commodities()
         self.open_psr_source_document()
         self.get_document_type()
+        self.extract_psr_table()
         self.validate_psr_table()
         self.read_psr_table()
         self.process_psr_table()
@@ -42,6 +48,8 @@ class RooDocument(object):
         self.check_multiple_manufacture()
         if self.check_coverage:
             self.check_commodity_coverage()
+        if self.check_leaf_coverage:
+            self.check_leaf_code_coverage()
         if self.validate_min_max:
             self.validate_min_max_values()
         self.write_report_on_rules_ending_with_or()
@@ -54,16 +62,16 @@ class RooDocument(object):
         if os.path.exists(filename):
             os.remove(filename)
 
-        if len(g.rule_ends_with_or) > 0:
+        if len(self.context.rule_ends_with_or) > 0:
             with open(filename, 'w') as f:
-                json.dump(g.rule_ends_with_or, f, indent=4)
+                json.dump(self.context.rule_ends_with_or, f, indent=4)
 
         print("\nFinished processing {file}\n".format(file=self.docx_filename))
 
     def check_multiple_manufacture(self):
-        if len(g.multiple_manufacture) > 0:
+        if len(self.context.multiple_manufacture) > 0:
             Warning("The word 'Manufacture' appears more than once in these rules. This may be okay, but check, in case these rules should have been split.\n\n{multiple_manufacture}".format(
-                multiple_manufacture=", ".join(g.multiple_manufacture)
+                multiple_manufacture=", ".join(self.context.multiple_manufacture)
             ))
 
     def check_opening_dash_in_rule(self):
@@ -89,14 +97,14 @@ class RooDocument(object):
         self.defaults_folder = os.path.join(self.resources_folder, "defaults")
 
         # Get paths from environment variables
-        self.preferred_code_list_file = EnvironmentVariable('preferred_code_list_file', 'string', permit_omission=True).value
         self.ott_prototype_path = EnvironmentVariable('ott_prototype_path', 'string', permit_omission=True).value
-        self.all_rules_path = EnvironmentVariable('all_rules_path', 'string', permit_omission=True).value
 
         # Get features
         self.validate_psr_tables = EnvironmentVariable('validate_psr_tables', 'int', permit_omission=False).value
         self.check_coverage = EnvironmentVariable('check_coverage', 'int', permit_omission=False).value
+        self.check_leaf_coverage = EnvironmentVariable('check_leaf_coverage', 'bool', permit_omission=True).value
         self.validate_min_max = EnvironmentVariable('validate_min_max', 'int', permit_omission=False).value
+        self.export_formats = ExportFormats.from_environment()
         modern_documents = EnvironmentVariable('modern_documents', 'string', permit_omission=False).value
         self.modern_documents = modern_documents.split(",")
 
@@ -109,12 +117,10 @@ class RooDocument(object):
                 self.docx_filepath = os.path.join(self.source_folder, self.docx_filename)
             else:
                 Error("Please supply an input document.", show_additional_information=False)
-        g.docx_filename = self.docx_filename
+        self.context.docx_filename = self.docx_filename
 
         # Export paths
-        self.export_filename = self.docx_filename.replace(".docx", "").replace(" ", "-").lower()
-        self.export_filename = self.export_filename.replace("_psr", "")
-        self.export_filename = self.export_filename.replace("-psr", "")
+        self.export_filename = func.get_export_filename(self.docx_filename)
         self.export_filepath = os.path.join(self.export_folder, self.export_filename) + ".json"
 
         # Configuration / footnotes
@@ -134,49 +140,21 @@ class RooDocument(object):
         """ Function to pull in a list of all of the rules from the XI tariff and the
         classes of rule that are associated with each of these. These are used (for example)
         in determining if a rule is wholly-obtained, and to populate the 'class' node
-        in the resultant JSON file."""
-        if not os.path.exists(self.all_rules_path):
-            self.all_rules_path = os.path.join(self.defaults_folder, "all_rules.json")
-        f = open(self.all_rules_path)
-        g.all_rules_with_classes = json.load(f)
-        f.close()
+        in the resultant JSON file. The list is loaded once per process and shared."""
+        self.context.all_rules_with_classes = self.reference_data.all_rules_with_classes
+
+    def get_corrections(self):
+        """ The corrections in corrections.json, compiled once per process and shared """
+        self.context.corrections = self.reference_data.corrections
 
     def get_commodities(self):
-        """ Function to retrieve all of the commodity codes (latest version) from an external CSV file
-        """
-        g.all_headings = {}
-        g.all_subheadings = {}
-        g.all_codes = []
-        found_headings = []
-        self.check_preferred_code_list_file_exists()
-        with open(self.preferred_code_list_file) as csv_file:
-            csv_reader = csv.DictReader(csv_file)
-            for row in csv_reader:
-                if row["Class"] == "commodity":
-                    if row["Commodity code"][0:4] not in found_headings:
-                        found_headings.append(row["Commodity code"][0:4])
-                        g.all_codes.append(row["Commodity code"])
-
-                if row["Commodity code"][-6:] == "000000" and row["Commodity code"][-8:] != "00000000":
-                    heading = row["Commodity code"][0:4]
-                    g.all_headings[heading] = row["Description"]
-
-                if row["Commodity code"][-4:] == "0000" and row["Commodity code"][-6:] != "000000":
-                    subheading = row["Commodity code"][0:6]
-                    g.all_subheadings[subheading] = row["Description"]
-
-        csv_file.close()
-
-    def check_preferred_code_list_file_exists(self):
-        """ The commodity code list is used to work out the chapters, headings and subheadings
-        that are covered by the rules of origin (PSRs). If the file that is specified in the
-        environment variables does not exist, then the default file, which exists within this
-        repository.
+        """ Function to retrieve all of the commodity codes (latest version) from the shared
+        reference data, which is read from the commodity code list once per process
         """
-        # Get default commodity code list file
-        self.default_code_list_file = os.path.join(self.defaults_folder, "uk_commodities_2023-10-23.csv")
-        if not os.path.exists(self.preferred_code_list_file):
-            self.preferred_code_list_file = self.default_code_list_file
+        self.context.all_headings = self.reference_data.all_headings
+        self.context.all_subheadings = self.reference_data.all_subheadings
+        self.context.tariff_hierarchy = self.reference_data.tariff_hierarchy
+        self.context.all_codes = self.reference_data.all_codes
 
     def export_min_max(self):
         """ This is a function that is used for debug purposes. It extracts the full list
@@ -226,7 +204,7 @@ class RooDocument(object):
 
     def open_psr_source_document(self):
         print("\nBeginning processing {file}\n".format(file=self.docx_filename))
-        self.document = Document(self.docx_filepath)
+        self.document = DocxTableReader(self.docx_filepath)
 
     def get_document_type(self):
         """ Work out whether the document is modern or legacy
@@ -237,66 +215,19 @@ class RooDocument(object):
         else:
             self.modern = False
 
+    def extract_psr_table(self):
+        """ Reads the rows of the table, along with the diagnostics that the table checks use,
+        in a single pass """
+        self.psr_table = PsrTable(self.document.tables, self.modern)
+
     def read_psr_table(self):
         print("- Reading table for file {file}".format(file=self.docx_filename))
         # Count the tables - if there is more than one then error out
-        table_count = len(self.document.tables)
-        if table_count > 1:
+        if self.psr_table.table_count > 1:
             Error("Ensure there is only one table in the document and re-run", show_additional_information=False)
-        table = self.document.tables[0]
-
-        if self.modern:
-            rename_keys = {
-                "Classification": "original_heading",
-                "PSR": "original_rule"
-            }
-            required_keys = ["original_heading", "original_rule"]
-        else:
-            rename_keys = {
-                "Heading": "original_heading",
-                "Classification": "original_heading",
-                "Description": "description",
-                "Description of goods": "description",
-                "Conditions": "original_rule",
-                "PSR": "original_rule",
-                "PSR2": "original_rule2"
-            }
-            required_keys = ["original_heading", "description", "original_rule", "original_rule2"]
-
-        raw_table_row_data = []
-
-        keys = None
-        for i, row in enumerate(table.rows):
-            text = (cell.text for cell in row.cells)
-
-            # Establish the mapping based on the first row
-            # headers; these will become the keys of our dictionary
-            if i == 0:
-                keys = tuple(text)
-                continue
 
-            # Construct a dictionary for this row, mapping
-            # keys to values for this row
-            row_data = dict(zip(keys, text))
-            raw_table_row_data.append(row_data)
-
-        self.table_rows = []
-        for item in raw_table_row_data:
-            if item != {}:
-                for old_key in rename_keys:
-                    if old_key in item.keys():
-                        new_key = rename_keys[old_key]
-                        item[new_key] = item.pop(old_key)
-
-                self.table_rows.append(item)
-
-        sample_table_row = self.table_rows[0]
-        table_is_valid = True
-        for required_key in required_keys:
-            if required_key not in sample_table_row.keys():
-                table_is_valid = False
-                break
-        if not table_is_valid:
+        self.table_rows = self.psr_table.rows
+        if not self.psr_table.is_valid():
             Error(
                 "The source table is not valid. Please check that all columns are labelled correctly.\n\nFor 2-column documents, ensure that there is a single table where the two columns are entitled\n\n- Classification\n- PSR\n\nFor 3- or 4-column documents, ensure the columns are entitled\n\n- Classification\n- Description\n- PSR\n- PSR2",
                 show_additional_information=False
@@ -322,19 +253,14 @@ class RooDocument(object):
             elif "Chapter" in row["original_heading"]:
                 pass
             else:
-                rule_set = RuleSetModern(row)
+                rule_set = RuleSetModern(row, self.context)
                 # self.rule_sets.append(rule_set.as_dict())
                 self.rule_sets.append(rule_set)
 
     def count_cells_in_columns(self):
-        error = False
         print("- Counting table cells per row for file {file}".format(file=self.docx_filename))
-        for row in self.table_rows:
-            if len(row) > 4:
-                error = True
-                break
-        if error:
-            print("  - At last one row has an incorrect number of cells", str(len(row)))
+        if self.psr_table.oversized_row_length is not None:
+            print("  - At last one row has an incorrect number of cells", str(self.psr_table.oversized_row_length))
             sys.exit()
 
     def process_psr_table_legacy(self):
@@ -346,7 +272,7 @@ class RooDocument(object):
         self.rule_sets = []
         row_index = 0
         for row in self.table_rows:
-            rule_set = RuleSetLegacy(row, row_index, self.footnotes)
+            rule_set = RuleSetLegacy(row, row_index, self.footnotes, self.context)
             # if rule_set.valid:
             self.rule_sets.append(rule_set)
             row_index += 1
@@ -355,37 +281,37 @@ class RooDocument(object):
         self.remove_invalid_entries()
 
         # Check for mixes of ex codes and non-ex codes in the heading column
-        if len(g.mix_ex_non_ex_errors) > 0:
+        if len(self.context.mix_ex_non_ex_errors) > 0:
             Error(
                 "Lines mix ex codes and non-ex codes, which is not permitted. Please split the following into multiple lines:\n\n{errors}".format(
-                    errors=" | ".join(g.mix_ex_non_ex_errors)
+                    errors=" | ".join(self.context.mix_ex_non_ex_errors)
                 ),
                 show_additional_information=False
             )
 
         # Check for non-contiguous codes separated by "and"
-        if len(g.non_contiguous_and_errors) > 0:
+        if len(self.context.non_contiguous_and_errors) > 0:
             Error(
                 "Lines contain non-contiguous codes separated by 'and', which is not permitted. Please split the following into multiple lines:\n\n{errors}".format(
-                    errors=" | ".join(g.non_contiguous_and_errors)
+                    errors=" | ".join(self.context.non_contiguous_and_errors)
                 ),
                 show_additional_information=False
             )
 
         # Check for non-contiguous codes separated by "and"
-        if len(g.multiple_and_errors) > 0:
+        if len(self.context.multiple_and_errors) > 0:
             Error(
                 "headings contain multiple 'ands', which is not permitted. Please split the following into multiple lines:\n\n{errors}".format(
-                    errors=" | ".join(g.multiple_and_errors)
+                    errors=" | ".join(self.context.multiple_and_errors)
                 ),
                 show_additional_information=False
             )
 
         # Check for non-contiguous ands in heading column
-        if len(g.non_contiguous_and_errors) > 0:
+        if len(self.context.non_contiguous_and_errors) > 0:
             Error(
                 "Lines contain non-contiguous values separated by 'and', which is not permitted. Please split the following into multiple lines:\n\n{errors}".format(
-                    errors=" | ".join(g.non_contiguous_and_errors)
+                    errors=" | ".join(self.context.non_contiguous_and_errors)
                 ),
                 show_additional_information=False
             )
@@ -394,10 +320,10 @@ class RooDocument(object):
         self.process_chapters()
 
         # Check for possible missing hyphens
-        if len(g.possible_missing_hyphens) > 0:
+        if len(self.context.possible_missing_hyphens) > 0:
             Warning(
                 "Rules contain the word manufacture, but not as many hyphens as would have been expected. Bullets will be omitted:\n\n{warnings}".format(
-                    warnings=" | ".join(g.possible_missing_hyphens)
+                    warnings=" | ".join(self.context.possible_missing_hyphens)
                 ))
 
     def expand_subdivision_hierarchy(self):
@@ -439,33 +365,10 @@ class RooDocument(object):
 
         All of these issues need to be manually corrected in the source Word document
         """
-        empty_rows = []
-        double_ex_rows = []
-        mixed_conjunctions = []
-        more_than_one_comma = []
-        row_index = 0
-        last_valid_heading = ""
-        for row in self.table_rows:
-            original_heading = row["original_heading"]
-            original_heading = original_heading.replace(";", ",")
-            original_heading = original_heading.replace(u'\xa0', u' ')
-            original_heading = original_heading.replace("ex ex", "ex")
-
-            if original_heading == "" or original_heading is None:
-                empty_rows.append((row_index, last_valid_heading))
-            else:
-                last_valid_heading = original_heading
-
-            if self.is_double_ex(original_heading):
-                double_ex_rows.append((row_index, last_valid_heading))
-
-            if self.has_mixed_conjunctions(original_heading):
-                mixed_conjunctions.append((row_index, last_valid_heading))
-
-            if self.has_more_than_one_comma(original_heading):
-                more_than_one_comma.append((row_index, last_valid_heading))
-
-            row_index += 1
+        empty_rows = self.psr_table.empty_rows
+        double_ex_rows = self.psr_table.double_ex_rows
+        mixed_conjunctions = self.psr_table.mixed_conjunctions
+        more_than_one_comma = self.psr_table.more_than_one_comma
 
         # Priority 1 - report on empty column 1 cells
         if len(empty_rows) > 0:
@@ -505,35 +408,6 @@ class RooDocument(object):
             print(msg)
             sys.exit()
 
-    def is_double_ex(self, s):
-        if s is not None:
-            occurrence_count = s.count("ex")
-            return True if occurrence_count > 1 else False
-        else:
-            return False
-
-    def has_more_than_one_comma(self, s):
-        if s is not None:
-            occurrence_count = s.count(",")
-            return True if occurrence_count > 1 else False
-        else:
-            return False
-
-    def has_mixed_conjunctions(self, s):
-        if s is not None:
-            conjunction_count = 0
-            if "," in s:
-                conjunction_count += 1
-            if "to" in s:
-                conjunction_count += 1
-            if "-" in s:
-                conjunction_count += 1
-            if "and" in s:
-                conjunction_count += 1
-            return True if conjunction_count > 1 else False
-        else:
-            return False
-
     def validate_existence_of_all_headings_subheadings(self):
         """
         Before trying to normalise the chapters, run a check to make sure that all of
@@ -547,16 +421,16 @@ class RooDocument(object):
         for rule_set in self.rule_sets:
             for heading in rule_set.headings:
                 heading = heading.strip()
-                if heading not in g.all_headings:
+                if heading not in self.context.all_headings:
                     errors.append(heading)
 
             for subheading in rule_set.subheadings:
                 subheading = subheading.strip()
                 if subheading[-2:] == "00":
-                    if subheading[0:4] not in g.all_headings:
+                    if subheading[0:4] not in self.context.all_headings:
                         errors.append(heading)
                 else:
-                    if subheading not in g.all_subheadings:
+                    if subheading not in self.context.all_subheadings:
                         errors.append(subheading)
 
         if len(errors) > 0:
@@ -568,21 +442,31 @@ class RooDocument(object):
         self.transfer_rule_sets_to_temporary_variable()
         # Break the full set of rules into individual chapters
         # and process them individually
+        rule_sets_by_chapter = self.partition_rule_sets_by_chapter()
         chapters = [x for x in range(1, 98) if x != 77]
         for chapter_index in chapters:
-            g.residual_added = []
-            chapter = RuleSetChapter(chapter_index, self.temporary_rule_sets)
+            self.context.residual_added = []
+            chapter = RuleSetChapter(chapter_index, rule_sets_by_chapter.get(chapter_index, []), self.context)
             self.rule_sets += chapter.chapter_rule_sets
             if chapter.whole_chapter_rule_count > 1:
                 if chapter.whole_chapter_rule_count != len(chapter.rule_sets):
-                    # print(g.docx_filename, "in chapter", str(chapter_index), "has a chapter rule count of", str(chapter.whole_chapter_rule_count))
+                    # print(self.context.docx_filename, "in chapter", str(chapter_index), "has a chapter rule count of", str(chapter.whole_chapter_rule_count))
                     obj = {
-                        "filename": g.docx_filename,
+                        "filename": self.context.docx_filename,
                         "chapter_index": chapter_index,
                         "whole_chapter_rule_count": chapter.whole_chapter_rule_count,
                         "rule_count": len(chapter.rule_sets)
                     }
-                    g.multiple_chapter_rule_list.append(obj)
+                    self.context.multiple_chapter_rule_list.append(obj)
+
+    def partition_rule_sets_by_chapter(self):
+        """
+        Splits the rule sets into their chapters in a single pass, keeping them in their original order
+        """
+        rule_sets_by_chapter = {}
+        for rule_set in self.temporary_rule_sets:
+            rule_sets_by_chapter.setdefault(rule_set.chapter, []).append(rule_set)
+        return rule_sets_by_chapter
 
     def transfer_rule_sets_to_temporary_variable(self):
         """
@@ -629,12 +513,11 @@ class RooDocument(object):
         a = 1
 
     def write_json_file(self):
+        """ Each export format is serialized once and published to the export folder and, if one
+        is configured, to the OTT prototype folder """
         self.copy_rule_sets_to_object_list()
-        out_file = open(self.export_filepath, "w")
-        json.dump({"rule_sets": self.rule_set_object_list}, out_file, indent=6)
-        out_file.close()
-        dest = os.path.join(self.ott_prototype_path, self.export_filename + ".json")
-        shutil.copy(self.export_filepath, dest)
+        export_files = self.export_formats.serialize(self.export_filename, self.rule_set_object_list)
+        publish_export_files(export_files, self.export_folder, self.ott_prototype_path)
 
     def kill_document(self):
         self.document = None
@@ -646,29 +529,20 @@ class RooDocument(object):
 
     def count_document_table_row_cells(self):
         print("- Counting cells in each row for {file}".format(file=self.docx_filename))
-        table = self.document.tables[0]
-        cells = []
-        cell_previous = "UNSPECIFIED"
-        for i, row in enumerate(table.rows):
-            cell1 = row.cells[0].text.strip()
-            if cell1 == "":
+        if self.psr_table.first_cell_error is not None:
+            error, cell_previous = self.psr_table.first_cell_error
+            if error == "empty":
                 Error("Empty cell in first column not permitted - row after {cell_previous}.".format(cell_previous=cell_previous), show_additional_information=False)
-            cell_previous = cell1
-
-            cell_count = len(row.cells)
-            if cell_count > 4:
+            else:
                 Error("There must not be more than 4 columns in the table.", show_additional_information=False)
 
-            cells.append(cell_count)
-        cell_set = list(set(cells))
-
-        if len(cell_set) > 1:
+        if len(self.psr_table.cell_counts) > 1:
             Error("Please ensure that all rows have the same number of columns and that they are of equal width.", show_additional_information=False)
 
     def count_document_tables(self):
         """ If there is more than a single table in the document, then the process stops """
         print("- Counting tables for {file}".format(file=self.docx_filename))
-        table_count = len(self.document.tables)
+        table_count = self.psr_table.table_count
         if table_count > 1:
             Error("Please ensure that there is only one table in the document.", show_additional_information=False)
         elif table_count == 0:
@@ -677,17 +551,38 @@ class RooDocument(object):
     def check_commodity_coverage(self):
         print("- Checking that all commodity codes are covered for {file}".format(file=self.docx_filename))
         self.comm_code_omissions = []
-        f = open(self.export_filepath)
-        json_obj = json.load(f)
-        for comm_code in g.all_codes:
-            v = CommCodeValidator(comm_code, json_obj)
-            ret = v.validate()
-            if ret:
+        index = IntervalIndex.from_rule_sets(self.rule_sets)
+        for comm_code in self.context.all_codes:
+            if comm_code >= "9800000000":
+                continue
+            if not index.covers(comm_code):
                 self.comm_code_omissions.append(comm_code)
                 print("  - No coverage for commodity code {comm_code}".format(comm_code=comm_code))
 
         print("  - Finished validating {file}".format(file=self.docx_filename))
 
+    def check_leaf_code_coverage(self):
+        """ Checks every 10-digit commodity code in the code list, rather than just the first
+        code in each heading, and reports any gaps as ranges of codes """
+        print("- Checking that all commodity code leaves are covered for {file}".format(file=self.docx_filename))
+        leaf_coverage = LeafCoverage(self.reference_data.leaf_code_array)
+        self.leaf_code_gaps = leaf_coverage.find_gaps(self.rule_sets)
+        for first_code, last_code, count in self.leaf_code_gaps:
+            if count == 1:
+                print("  - No coverage for commodity code {code}".format(code=first_code))
+            else:
+                print("  - No coverage for commodity codes {first_code} to {last_code} ({count} codes)".format(
+                    first_code=first_code,
+                    last_code=last_code,
+                    count=count
+                ))
+
+        uncovered = sum(count for first_code, last_code, count in self.leaf_code_gaps)
+        print("  - {covered} of {total} commodity code leaves are covered".format(
+            covered=len(leaf_coverage.leaf_codes) - uncovered,
+            total=len(leaf_coverage.leaf_codes)
+        ))
+
     def validate_min_max_values(self):
         print("- Checking min max for {file}".format(file=self.docx_filename))
         issues = []
@@ -1,13 +1,153 @@
 import re
 import copy
-import json
-import os
-import classes.globals as g
+
+from classes.rewrite_table import RewriteTable, Replace, Substitute
+
+# The text rewrites applied to every rule are compiled once, as ordered tables.
+# Each table must produce exactly the same text as running its steps in sequence.
+
+CLEANSE_PUNCTUATION = RewriteTable([
+    Replace("—", "-"),
+    Replace(";\n-", "\n-"),
+    Replace("; and", ", and"),
+    Replace(";\nor\n", "; or\n"),
+    Replace("product\nor\nManufacture", "product; or\nManufacture"),
+    Replace("Manufacture in which;", "Manufacture in which:"),
+    Replace("Manufacture;", "Manufacture:"),
+    Replace("MaxNOM", "MAXNOM")
+])
+
+CLEANSE_EXPANSIONS = RewriteTable([
+    Substitute(r'[ \t]+', " ", guard=("\t", "  ")),
+    Replace(" %", "%"),
+    Replace(" cm", "&nbsp;cm"),
+    Substitute(r'MAXNOM ([0-9]{1,3}%) \(EXW\)', "A maximum of \\1 of the EXW is made up of non-originating parts (MaxNOM)", guard="MAXNOM "),
+    Substitute(r'RVC ([0-9]{1,3})% \(FOB\)', "Your goods contain a Regional Value Content (RVC) of at least \\1% of the Free on Board (FOB) cost of the goods", guard="RVC "),
+    Substitute(r'([^\(])FOB', "\\1Free on Board (FOB) cost", guard="FOB"),
+    Replace("\t", " "),
+    Replace("and/or", "and&nbsp;/&nbsp;or")
+])
+
+CLEANSE_LISTS = RewriteTable([
+    Substitute(r"\(([a-z])\) ", "\n- (\\1) ", guard=") "),
+    Substitute(r"\(([a-z])\) ", "\\1) ", guard=") "),
+    Replace("ex- works", "ex-works"),
+    Replace("semi heated", "semi-heated"),
+    Replace("whether or note", "whether or not"),
+    Replace("Manufacture form", "Manufacture from"),
+    Replace("nonassembled", "non-assembled"),
+    Replace("\n- \n- ", "\n- "),
+    Replace(": - ", ":\n- "),
+    Replace("; - ", ";\n- "),
+    Replace("; and - ", "; and \n- "),
+    Replace("\u2014", "-")
+])
+
+CLEANSE_WORDING = RewriteTable([
+    Replace("Weaving combined with making-up including cutting", "Weaving, combined with making-up, including cutting"),
+    Replace("in column (3)", "in the rule above"),
+    Replace("non originating", "non-originating"),
+    Replace("shall not exceed", "must not exceed")
+])
+
+CLEANSE_MARKDOWN = RewriteTable([
+    Replace("- - ", "- "),
+    Replace(",\n- and\n\n", ", and\n"),
+    Replace(",\n- and\n", ", and\n"),
+    # Remove deliberately inserted <b> tags and replace with markdown
+    Replace("<b>", "**"),
+    Replace("</b>", "**"),
+    Replace(", or\n", ", *or*\n"),
+    Replace("in which\n", "in which:\n")
+])
+
+FOOTNOTE_REFERENCES = Substitute(r"\( ([0-9]{1,3}) \)", "", guard="( ")
+
+MAXNOM_PERCENTAGE = Substitute(r"([0-9]{1,3})% MAXNOM", "The maximum value of non-originating materials (MaxNOM) cannot exceed \\1%", guard="% MAXNOM")
+
+EXCEEDS_PERCENTAGE = re.compile(r"exceed[s]? [0-9]{1,3}% of")
+
+MISTYPED_OPENING_HYPHENS = Substitute(r'\n-([^ ])', "\n- \\1", guard="\n-")
+
+EMBOLDEN_PERCENTAGES = RewriteTable([
+    Substitute(r"([0-9]{1,3}),([0-9]{1,3}([ %]))", "\\1.\\2\\3", guard=","),
+    Replace(" per cent", "%"),
+    Replace("  ", " "),
+    Replace(" %", "%"),
+    Substitute(r"([0-9]{1,3}\.[0-9]{1,2}%)", "**\\1**", guard="%"),
+    Substitute(r"([0-9]{1,3}),([0-9]{1,2})\%", "\\1.\\2%", guard="%"),
+    Substitute(r" ([0-9]{1,3}\%)", " **\\1**", guard="%")
+])
+
+HYPERLINK_HEADINGS = RewriteTable([
+    Substitute(r"([0-9]{2}).([0-9]{2})$", " \\1\\2."),
+
+    Replace("headings Nos ", "heading "),
+    Replace("headings No ", "heading "),
+    Replace("heading Nos ", "heading "),
+    Replace("heading No ", "heading "),
+    Replace("sub-heading", "subheading"),
+    Replace("Sub-heading", "Subheading"),
+    Replace("Chapter", "chapter"),
+
+    Substitute(r" ([0-9]{2}).([0-9]{2})([., ])", " \\1\\2\\3"),
+    Substitute(r" ([0-9]{1,4}) through ([0-9]{1,4})([., ])", " \\1 to \\2\\3", guard=" through "),
+
+    # Deal with subheadings
+    Substitute(r" ([0-9]{4}).([0-9]{2})([., ])", " \\1\\2\\3"),
+    Replace("subheadings", "subheading"),
+    Substitute(r" subheading ([0-9]{4}) to ([0-9]{4})([., ])", " subheading \\1 to subheading \\2\\3", guard=" subheading "),
+    Substitute(r" subheading ([0-9]{6}), ([0-9]{6})([., ])", " subheading \\1, subheading \\2\\3", guard=" subheading ", repeat=4),
+    Substitute(r" subheading ([0-9]{6}) and ([0-9]{6})([., ])", " subheading \\1 and subheading \\2\\3", guard=" subheading "),
+    Substitute(r" subheading ([0-9]{6}) and ([0-9]{6})$", " subheading \\1 and subheading \\2", guard=" subheading "),
+    Substitute(r" subheading ([0-9]{6}) or ([0-9]{6})([., ])", " subheading \\1 or subheading \\2\\3", guard=" subheading "),
+    Substitute(r" subheading ([0-9]{6}) or ([0-9]{6})$", " subheading \\1 or subheading \\2", guard=" subheading "),
+    Substitute(r" subheading ([0-9]{6}) to ([0-9]{6})([., ])", " subheading \\1 to subheading \\2\\3", guard=" subheading "),
+    Substitute(r" subheading ([0-9]{6}) to ([0-9]{6})$", " subheading \\1 to subheading \\2", guard=" subheading "),
+    Substitute(r"([Ss]ubheading) ([0-9]{6})([ ,;.])", "[\\1 \\2](/subheadings/\\2x0000-80)\\3", guard="ubheading "),  # Links in markdown
+    Replace("x0000-80", "0000-80"),
+    Substitute(r" heading ([0-9]{2}).([0-9]{2})\n", " [heading \\1\\2](/headings/\\1\\2)\n", guard=" heading "),
+
+    # Deal with headings
+    Replace("headings", "heading"),
+    Substitute(r" heading ([0-9]{4}) to ([0-9]{4})([., ])", " heading \\1 to heading \\2\\3", guard=" heading "),
+    Substitute(r" heading ([0-9]{4}), ([0-9]{4})([., ])", " heading \\1, heading \\2\\3", guard=" heading ", repeat=4),
+    Substitute(r" heading ([0-9]{4}) and ([0-9]{4})([., ])", " heading \\1 and heading \\2\\3", guard=" heading "),
+    Substitute(r" heading ([0-9]{4}) and ([0-9]{4})$", " heading \\1 and heading \\2", guard=" heading "),
+    Substitute(r" heading ([0-9]{4}) or ([0-9]{4})([., ])", " heading \\1 or heading \\2\\3", guard=" heading "),
+    Substitute(r" heading ([0-9]{4}) or ([0-9]{4})$", " heading \\1 or heading \\2", guard=" heading "),
+    Substitute(r" heading ([0-9]{4}) to ([0-9]{4})([., ])", " heading \\1 to heading \\2\\3", guard=" heading "),
+    Substitute(r" heading ([0-9]{4}) to ([0-9]{4})$", " heading \\1 to heading \\2", guard=" heading "),
+    Substitute(r" heading ([0-9]{4})$", " heading \\1", guard=" heading "),
+    Substitute(r" heading ([0-9]{4})\n", " heading \\1.\n", guard=" heading "),
+    Substitute(r"([Hh]eading)(s*) ([0-9]{1,4})([ ,;.])", "[\\1\\2 \\3](/headings/\\3)\\4", guard="eading"),  # Links in markdown
+
+    # Deal with chapters
+    Replace("Chapter", "chapter"),
+    Replace("chapters", "chapter"),
+    Substitute(r" chapter ([0-9]{1,2}), ([0-9]{1,2})([ ,;.])", " chapter \\1, chapter \\2\\3", guard=" chapter ", repeat=4),
+    Substitute(r"chapter ([0-9]{1,2}) to ([0-9]{1,2})([., ])", "chapter \\1 to chapter \\2\\3", guard="chapter "),
+    Substitute(r"([Cc]hapter)(s*) ([0-9])([ ,;.])", "\\1\\2 0\\3\\4", guard="hapter"),
+    Substitute(r"([Cc]hapter)(s*) ([0-9][0-9]) and ([1-9]) ", "\\1\\2 \\3 and 0\\4 ", guard="hapter"),
+    Substitute(r"([Cc]hapter)(s*) ([0-9]{1,2}) and ([0-9]{1,2})", "[\\1 \\3](/chapters/\\3) and chapter \\4", guard="hapter"),  # Links in markdown
+    Substitute(r"([Cc]hapter)(s*) ([0-9]{1,2}) or ([0-9]{1,2})", "[\\1 \\3](/chapters/\\3) or chapter \\4", guard="hapter"),  # Links in markdown
+    Substitute(r"([Cc]hapter)(s*) ([0-9])([ ,;.])", "[\\1\\2  \\3](/chapters/0\\3)\\4", guard="hapter"),  # Links in markdown
+    Substitute(r"([Cc]hapter)(s*) ([0-9]{1,2})([ ,;.])", "[\\1\\2 \\3](/chapters/\\3)\\4", guard="hapter"),  # Links in markdown
+    Substitute(r"chapter 0([1-9])", "chapter \\1", guard="chapter 0"),
+
+    Substitute(r" +", " ", guard="  "),
+
+    # Add in non-breaking spaces
+    Substitute(r"chapter ([0-9]{1,2})", "chapter&nbsp;\\1", guard="chapter "),
+    Substitute(r"subheading ([0-9]{6})", "subheading&nbsp;\\1", guard="subheading "),
+    Substitute(r"heading ([0-9]{4})", "heading&nbsp;\\1", guard="heading ")
+])
 
 
 class Rule(object):
-    def __init__(self, rule_string, heading):
+    def __init__(self, rule_string, heading, context):
         self.heading = heading
+        self.context = context
         self.boolean_operator = None
         self.quota = False
         self.is_import = True
@@ -37,28 +177,12 @@ class Rule(object):
         self.check_for_mistyped_opening_hyphens()
 
     def check_for_mistyped_opening_hyphens(self):
-        self.rule_string = re.sub(r'\n-([^ ])', "\n- \\1", self.rule_string)
+        self.rule_string = MISTYPED_OPENING_HYPHENS.apply(self.rule_string)
 
     def cleanse(self):
-        self.rule_string = self.rule_string.replace("—", "-")
-        self.rule_string = self.rule_string.replace("—", "-")
-        self.rule_string = self.rule_string.replace(";\n-", "\n-")
-        self.rule_string = self.rule_string.replace("; and", ", and")
-        self.rule_string = self.rule_string.replace(";\nor\n", "; or\n")
-        self.rule_string = self.rule_string.replace("product\nor\nManufacture", "product; or\nManufacture")
-        self.rule_string = self.rule_string.replace("Manufacture in which;", "Manufacture in which:")
-        self.rule_string = self.rule_string.replace("Manufacture;", "Manufacture:")
-        self.rule_string = self.rule_string.replace("MaxNOM", "MAXNOM")
+        self.rule_string = CLEANSE_PUNCTUATION.apply(self.rule_string)
         self.rule_string = self.rule_string.strip()
-        self.rule_string = re.sub(r'[ \t]+', " ", self.rule_string)
-        self.rule_string = self.rule_string.replace(" %", "%")
-        self.rule_string = self.rule_string.replace(" cm", "&nbsp;cm")
-        self.rule_string = re.sub(r'MAXNOM ([0-9]{1,3}%) \(EXW\)', "A maximum of \\1 of the EXW is made up of non-originating parts (MaxNOM)", self.rule_string)
-        self.rule_string = re.sub(r'RVC ([0-9]{1,3})% \(FOB\)', "Your goods contain a Regional Value Content (RVC) of at least \\1% of the Free on Board (FOB) cost of the goods", self.rule_string)
-        self.rule_string = re.sub(r'([^\(])FOB', "\\1Free on Board (FOB) cost", self.rule_string)
-        self.rule_string = re.sub("\t", " ", self.rule_string)
-
-        self.rule_string = self.rule_string.replace("and/or", "and&nbsp;/&nbsp;or")
+        self.rule_string = CLEANSE_EXPANSIONS.apply(self.rule_string)
 
         if self.rule_string[0:4] == "and\n":
             self.boolean_operator = "and"
@@ -80,45 +204,17 @@ class Rule(object):
         self.rule_string = self.rule_string.removesuffix(".")
         self.rule_string = self.rule_string.removeprefix("or ")
 
-        self.rule_string = re.sub("\(([a-z])\) ", "\n- (\\1) ", self.rule_string)
-        self.rule_string = re.sub("\(([a-z])\) ", "\\1) ", self.rule_string)
-        self.rule_string = self.rule_string.replace("ex- works", "ex-works")
-        self.rule_string = self.rule_string.replace("semi heated", "semi-heated")
-        self.rule_string = self.rule_string.replace("whether or note", "whether or not")
-        self.rule_string = self.rule_string.replace("Manufacture form", "Manufacture from")
-        self.rule_string = self.rule_string.replace("nonassembled", "non-assembled")
-
-        self.rule_string = self.rule_string.replace("\n- \n- ", "\n- ")
-        self.rule_string = self.rule_string.replace(": - ", ":\n- ")
-        self.rule_string = self.rule_string.replace("; - ", ";\n- ")
-        self.rule_string = self.rule_string.replace("; and - ", "; and \n- ")
-
-        self.rule_string = self.rule_string.replace("\u2014", "-")
+        self.rule_string = CLEANSE_LISTS.apply(self.rule_string)
         if len(self.rule_string) > 0:
             self.rule_string = self.rule_string[0].upper() + self.rule_string[1:]
 
-        self.rule_string = self.rule_string.replace("Weaving combined with making-up including cutting", "Weaving, combined with making-up, including cutting")
-        self.rule_string = self.rule_string.replace("in column (3)", "in the rule above")
-        self.rule_string = self.rule_string.replace("non originating", "non-originating")
-        self.rule_string = self.rule_string.replace("shall not exceed", "must not exceed")
+        self.rule_string = CLEANSE_WORDING.apply(self.rule_string)
 
         if self.rule_string == "." or self.rule_string.lower().startswith("as specified for"):
             self.rule_string = ""
 
-        corrections_file = os.path.join(os.getcwd(), "resources", "data", "corrections.json")
-        f = open(corrections_file)
-        corrections = json.load(f)
-        for correction in corrections:
-            self.rule_string = self.rule_string.replace(correction["from"], correction["to"])
-        self.rule_string = self.rule_string.replace("- - ", "- ")
-        self.rule_string = self.rule_string.replace(",\n- and\n\n", ", and\n")
-        self.rule_string = self.rule_string.replace(",\n- and\n", ", and\n")
-
-        # Remove deliberately inserted <b> tags and replace with markdown
-        self.rule_string = self.rule_string.replace("<b>", "**")
-        self.rule_string = self.rule_string.replace("</b>", "**")
-        self.rule_string = self.rule_string.replace(", or\n", ", *or*\n")
-        self.rule_string = self.rule_string.replace("in which\n", "in which:\n")
+        self.rule_string = self.context.corrections.apply(self.rule_string)
+        self.rule_string = CLEANSE_MARKDOWN.apply(self.rule_string)
         
         tmp = copy.copy(self.rule_string).strip("\n").strip()
         if len(tmp) > 3:
@@ -127,12 +223,12 @@ class Rule(object):
                     "heading": self.heading,
                     "rule": self.rule_string
                 }
-                g.rule_ends_with_or.append(obj)
+                self.context.rule_ends_with_or.append(obj)
                 a = 1
         a = 1
 
     def remove_footnote_references(self):
-        self.rule_string = re.sub("\( ([0-9]{1,3}) \)", "", self.rule_string)
+        self.rule_string = FOOTNOTE_REFERENCES.apply(self.rule_string)
 
     def check_for_quota(self):
         if "quota" in self.rule_string:
@@ -168,8 +264,8 @@ class Rule(object):
 
     def get_rule_class_lookup(self):
         self.rules_alphanumeric_only = self.alphanumeric_only(self.rule_string)
-        if self.rules_alphanumeric_only in g.all_rules_with_classes:
-            my_classes = g.all_rules_with_classes[self.rules_alphanumeric_only]
+        if self.rules_alphanumeric_only in self.context.all_rules_with_classes:
+            my_classes = self.context.all_rules_with_classes[self.rules_alphanumeric_only]
             if len(my_classes) > 0:
                 # Remove unspecified if this has previously been added
                 if "Unspecified" in self.rule_class:
@@ -200,93 +296,11 @@ class Rule(object):
             self.double_dash = True
 
     def embolden_percentages(self):
-        self.rule_string = re.sub("([0-9]{1,3}),([0-9]{1,3}([ %]))", "\\1.\\2\\3", self.rule_string)
-        self.rule_string = self.rule_string.replace(" per cent", "%")
-        self.rule_string = self.rule_string.replace("  ", " ")
-        self.rule_string = self.rule_string.replace(" %", "%")
-        self.rule_string = re.sub("([0-9]{1,3}\.[0-9]{1,2}%)", "**\\1**", self.rule_string)
-        self.rule_string = re.sub("([0-9]{1,3}),([0-9]{1,2})\%", "\\1.\\2%", self.rule_string)
-        self.rule_string = re.sub(" ([0-9]{1,3}\%)", " **\\1**", self.rule_string)
+        self.rule_string = EMBOLDEN_PERCENTAGES.apply(self.rule_string)
 
     def hyperlink_headings(self):
         self.rule_string = self.rule_string.strip()
-        self.rule_string = re.sub("([0-9]{2}).([0-9]{2})$", " \\1\\2.", self.rule_string)
-        
-        self.rule_string = self.rule_string.replace("headings Nos ", "heading ")
-        self.rule_string = self.rule_string.replace("headings No ", "heading ")
-        self.rule_string = self.rule_string.replace("heading Nos ", "heading ")
-        self.rule_string = self.rule_string.replace("heading No ", "heading ")
-        self.rule_string = self.rule_string.replace("sub-heading", "subheading")
-        self.rule_string = self.rule_string.replace("Sub-heading", "Subheading")
-        self.rule_string = self.rule_string.replace("Chapter", "chapter")
-
-        self.rule_string = re.sub(" ([0-9]{2}).([0-9]{2})([., ])", " \\1\\2\\3", self.rule_string)
-        self.rule_string = re.sub(" ([0-9]{1,4}) through ([0-9]{1,4})([., ])", " \\1 to \\2\\3", self.rule_string)
-
-        # Deal with subheadings
-        self.rule_string = re.sub(" ([0-9]{4}).([0-9]{2})([., ])", " \\1\\2\\3", self.rule_string)
-        self.rule_string = re.sub("subheadings", "subheading", self.rule_string)
-        self.rule_string = re.sub(" subheading ([0-9]{4}) to ([0-9]{4})([., ])", " subheading \\1 to subheading \\2\\3", self.rule_string)
-
-        for i in range(0, 4):
-            self.rule_string = re.sub(" subheading ([0-9]{6}), ([0-9]{6})([., ])", " subheading \\1, subheading \\2\\3", self.rule_string)
-
-        self.rule_string = re.sub(" subheading ([0-9]{6}) and ([0-9]{6})([., ])", " subheading \\1 and subheading \\2\\3", self.rule_string)
-        self.rule_string = re.sub(" subheading ([0-9]{6}) and ([0-9]{6})$", " subheading \\1 and subheading \\2", self.rule_string)
-
-        self.rule_string = re.sub(" subheading ([0-9]{6}) or ([0-9]{6})([., ])", " subheading \\1 or subheading \\2\\3", self.rule_string)
-        self.rule_string = re.sub(" subheading ([0-9]{6}) or ([0-9]{6})$", " subheading \\1 or subheading \\2", self.rule_string)
-
-        self.rule_string = re.sub(" subheading ([0-9]{6}) to ([0-9]{6})([., ])", " subheading \\1 to subheading \\2\\3", self.rule_string)
-        self.rule_string = re.sub(" subheading ([0-9]{6}) to ([0-9]{6})$", " subheading \\1 to subheading \\2", self.rule_string)
-
-        self.rule_string = re.sub("([Ss]ubheading) ([0-9]{6})([ ,;.])", "[\\1 \\2](/subheadings/\\2x0000-80)\\3", self.rule_string)  # Links in markdown
-        self.rule_string = re.sub("x0000-80", "0000-80", self.rule_string)
-        self.rule_string = re.sub(" heading ([0-9]{2}).([0-9]{2})\n", " [heading \\1\\2](/headings/\\1\\2)\n", self.rule_string)
-
-        # Deal with headings
-        self.rule_string = re.sub("headings", "heading", self.rule_string)
-        self.rule_string = re.sub(" heading ([0-9]{4}) to ([0-9]{4})([., ])", " heading \\1 to heading \\2\\3", self.rule_string)
-
-        for i in range(0, 4):
-            self.rule_string = re.sub(" heading ([0-9]{4}), ([0-9]{4})([., ])", " heading \\1, heading \\2\\3", self.rule_string)
-
-        self.rule_string = re.sub(" heading ([0-9]{4}) and ([0-9]{4})([., ])", " heading \\1 and heading \\2\\3", self.rule_string)
-        self.rule_string = re.sub(" heading ([0-9]{4}) and ([0-9]{4})$", " heading \\1 and heading \\2", self.rule_string)
-
-        self.rule_string = re.sub(" heading ([0-9]{4}) or ([0-9]{4})([., ])", " heading \\1 or heading \\2\\3", self.rule_string)
-        self.rule_string = re.sub(" heading ([0-9]{4}) or ([0-9]{4})$", " heading \\1 or heading \\2", self.rule_string)
-
-        self.rule_string = re.sub(" heading ([0-9]{4}) to ([0-9]{4})([., ])", " heading \\1 to heading \\2\\3", self.rule_string)
-        self.rule_string = re.sub(" heading ([0-9]{4}) to ([0-9]{4})$", " heading \\1 to heading \\2", self.rule_string)
-
-        self.rule_string = re.sub(" heading ([0-9]{4})$", " heading \\1", self.rule_string)
-        self.rule_string = re.sub(" heading ([0-9]{4})\n", " heading \\1.\n", self.rule_string)
-
-        self.rule_string = re.sub("([Hh]eading)(s*) ([0-9]{1,4})([ ,;.])", "[\\1\\2 \\3](/headings/\\3)\\4", self.rule_string)  # Links in markdown
-
-        # Deal with chapters
-        self.rule_string = self.rule_string.replace("Chapter", "chapter")
-        self.rule_string = self.rule_string.replace("chapters", "chapter")
-        for i in range(0, 4):
-            self.rule_string = re.sub(" chapter ([0-9]{1,2}), ([0-9]{1,2})([ ,;.])", " chapter \\1, chapter \\2\\3", self.rule_string)
-
-        self.rule_string = re.sub("chapter ([0-9]{1,2}) to ([0-9]{1,2})([., ])", "chapter \\1 to chapter \\2\\3", self.rule_string)
-
-        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9])([ ,;.])", "\\1\\2 0\\3\\4", self.rule_string)
-        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9][0-9]) and ([1-9]) ", "\\1\\2 \\3 and 0\\4 ", self.rule_string)
-        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9]{1,2}) and ([0-9]{1,2})", "[\\1 \\3](/chapters/\\3) and chapter \\4", self.rule_string)  # Links in markdown
-        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9]{1,2}) or ([0-9]{1,2})", "[\\1 \\3](/chapters/\\3) or chapter \\4", self.rule_string)  # Links in markdown
-        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9])([ ,;.])", "[\\1\\2  \\3](/chapters/0\\3)\\4", self.rule_string)  # Links in markdown
-        self.rule_string = re.sub("([Cc]hapter)(s*) ([0-9]{1,2})([ ,;.])", "[\\1\\2 \\3](/chapters/\\3)\\4", self.rule_string)  # Links in markdown
-        self.rule_string = re.sub("chapter 0([1-9])", "chapter \\1", self.rule_string)
-
-        self.rule_string = re.sub(" +", " ", self.rule_string)
-
-        # Add in non-breaking spaces
-        self.rule_string = re.sub("chapter ([0-9]{1,2})", "chapter&nbsp;\\1", self.rule_string)
-        self.rule_string = re.sub("subheading ([0-9]{6})", "subheading&nbsp;\\1", self.rule_string)
-        self.rule_string = re.sub("heading ([0-9]{4})", "heading&nbsp;\\1", self.rule_string)
+        self.rule_string = HYPERLINK_HEADINGS.apply(self.rule_string)
 
     def fix_punctuation(self):
         self.rule_string = self.rule_string.replace(" ,", ",").strip()
@@ -362,7 +376,7 @@ class Rule(object):
         self.rule_string = self.rule_string.replace("MAXNOM (EXW)", "MAXNOM of the EXW of the good")
 
         if "MAXNOM" in self.rule_string:
-            self.rule_string = re.sub("([0-9]{1,3})% MAXNOM", "The maximum value of non-originating materials (MaxNOM) cannot exceed \\1%", self.rule_string)
+            self.rule_string = MAXNOM_PERCENTAGE.apply(self.rule_string)
             self.rule_class.append("MAXNOM")
 
         if "your goods are produced from non-originating materials of any heading" in tmp \
@@ -380,7 +394,7 @@ class Rule(object):
         if "value of non-originating" in self.rule_string_original:
             self.rule_class = ["MAXNOM"]
 
-        if re.search("exceed[s]? [0-9]{1,3}% of", self.rule_string) and "value" in self.rule_string:
+        if EXCEEDS_PERCENTAGE.search(self.rule_string) and "value" in self.rule_string:
             self.rule_class = ["MAXNOM"]
 
         self.rule_string = self.rule_string.replace("EXW", "ex-works price (EXW)")
@@ -0,0 +1,105 @@
+from collections import OrderedDict
+
+from classes.rule import Rule
+from classes.environment_variable import EnvironmentVariable
+
+DEFAULT_RULE_CACHE_SIZE = 20000
+
+
+class RuleCache(object):
+    """
+    A bounded, least recently used memo of processed rules. The same rule wording (CTH, WO,
+    "Manufacture from materials of any heading, except that of the product" and so on) occurs
+    many times in each document and across agreements, and only needs processing once.
+
+    The output of a rule depends only on its (stripped) text and on the reference data, so the
+    text is the key and the cache is emptied whenever it is used with different reference data.
+    The heading only feeds the rule_ends_with_or report, which is recorded again on every hit.
+    """
+    def __init__(self, max_size=DEFAULT_RULE_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.all_rules_with_classes = None
+        self.corrections = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_rule(self, rule_string, heading, context):
+        """ Returns the dictionary for a rule, processing the rule only if it is not cached """
+        if self.max_size < 1:
+            return Rule(rule_string, heading, context).as_dict()
+
+        self.check_reference_data(context)
+        key = rule_string.strip()
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.process_rule(rule_string, heading, context)
+            self.entries[key] = entry
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            if entry["ends_with_or"] is not None:
+                context.rule_ends_with_or.append({
+                    "heading": heading,
+                    "rule": entry["ends_with_or"]
+                })
+
+        rule = dict(entry["rule"])
+        rule["class"] = list(rule["class"])
+        rule["footnotes"] = list(rule["footnotes"])
+        return rule
+
+    def process_rule(self, rule_string, heading, context):
+        reported = len(context.rule_ends_with_or)
+        rule = Rule(rule_string, heading, context)
+        ends_with_or = None
+        if len(context.rule_ends_with_or) > reported:
+            ends_with_or = context.rule_ends_with_or[-1]["rule"]
+        return {
+            "rule": rule.as_dict(),
+            "ends_with_or": ends_with_or
+        }
+
+    def check_reference_data(self, context):
+        if context.all_rules_with_classes is not self.all_rules_with_classes or context.corrections is not self.corrections:
+            self.entries.clear()
+            self.all_rules_with_classes = context.all_rules_with_classes
+            self.corrections = context.corrections
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    @staticmethod
+    def format_stats(stats):
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = 100 * stats["hits"] / lookups if lookups > 0 else 0
+        return "Rule cache: {hits} hits, {misses} misses ({hit_rate:.1f}% hit rate), {evictions} evictions".format(
+            hits=stats["hits"],
+            misses=stats["misses"],
+            hit_rate=hit_rate,
+            evictions=stats["evictions"]
+        )
+
+
+_rule_cache = None
+
+
+def get_rule_cache():
+    """ The rule cache is shared by every document built in this process. Its size is taken
+    from the rule_cache_size environment variable; a size of 0 turns the cache off """
+    global _rule_cache
+    if _rule_cache is None:
+        max_size = EnvironmentVariable('rule_cache_size', 'int', permit_omission=True).value
+        if max_size == "":
+            max_size = DEFAULT_RULE_CACHE_SIZE
+        _rule_cache = RuleCache(max_size)
+    return _rule_cache
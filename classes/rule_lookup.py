@@ -0,0 +1,139 @@
+import os
+import json
+import bisect
+
+from classes.binary_index import BinaryRuleIndex
+from classes.error import Error
+import classes.functions as func
+
+
+class RuleLookup(object):
+    """
+    Finds the rule sets of an agreement's export that apply to a commodity code, that is those
+    whose min / max range includes the code.
+
+    The rule sets are sorted by their min, alongside a running maximum of their max values, as
+    in the leaf coverage check. The rule sets that can include a code are those starting at or
+    before it, found with a binary search; working back from the last of them, the search can
+    stop as soon as the running maximum falls below the code, as no earlier range reaches it.
+    Only rule sets whose min and max are both 10-digit codes are indexed.
+    """
+    def __init__(self, rule_sets):
+        self.rule_sets = rule_sets
+        self.encoded_rule_sets = {}
+        bounds = []
+        for index, rule_set in enumerate(rule_sets):
+            if self.is_code(rule_set.get("min")) and self.is_code(rule_set.get("max")):
+                bounds.append((rule_set["min"], index))
+        bounds.sort()
+
+        self.mins = []
+        self.maxes = []
+        self.running_maxes = []
+        self.indexes = []
+        running_max = ""
+        for rule_set_min, index in bounds:
+            rule_set_max = rule_sets[index]["max"]
+            running_max = max(running_max, rule_set_max)
+            self.mins.append(rule_set_min)
+            self.maxes.append(rule_set_max)
+            self.running_maxes.append(running_max)
+            self.indexes.append(index)
+
+    @classmethod
+    def from_export(cls, export_filepath):
+        with open(export_filepath) as f:
+            return cls(json.load(f)["rule_sets"])
+
+    @staticmethod
+    def is_code(code):
+        return isinstance(code, str) and len(code) == 10 and code.isdigit()
+
+    @staticmethod
+    def normalize_code(code):
+        """ Commodity codes may be given with spaces or dots, and shorter codes (e.g. a heading or
+        subheading) are taken to be their first 10-digit code. Returns None for anything else """
+        code = code.replace(" ", "").replace(".", "")
+        if not code.isascii() or not code.isdigit() or len(code) > 10 or len(code) % 2 == 1:
+            return None
+        return code.ljust(10, "0")
+
+    def find_indexes(self, code):
+        """ The positions in the export of the rule sets that apply to the code, in export order """
+        found = []
+        position = bisect.bisect_right(self.mins, code) - 1
+        while position >= 0 and self.running_maxes[position] >= code:
+            if self.maxes[position] >= code:
+                found.append(position)
+            position -= 1
+        return self.order_indexes(found)
+
+    def get_bounds(self):
+        """ The mins and maxes of the indexed rule sets, in order of min, as integers """
+        return [int(rule_set_min) for rule_set_min in self.mins], [int(rule_set_max) for rule_set_max in self.maxes]
+
+    def order_indexes(self, positions):
+        """ The positions in the export of the rule sets at the given positions in the index, in
+        export order """
+        return sorted(self.indexes[position] for position in positions)
+
+    def get_rule_sets(self, indexes):
+        return [self.rule_sets[index] for index in indexes]
+
+    def find(self, code):
+        return self.get_rule_sets(self.find_indexes(code))
+
+    def encode(self, indexes):
+        """ The rule sets at the given positions as a JSON array. Each rule set is only encoded
+        the first time it is asked for """
+        encoded = []
+        for index in indexes:
+            encoded_rule_set = self.encoded_rule_sets.get(index)
+            if encoded_rule_set is None:
+                encoded_rule_set = json.dumps(self.rule_sets[index]).encode("utf-8")
+                self.encoded_rule_sets[index] = encoded_rule_set
+            encoded.append(encoded_rule_set)
+        return b"[" + b",".join(encoded) + b"]"
+
+
+class AgreementLookup(object):
+    """
+    The rule lookups for a number of agreements, loaded from their exports in the export folder,
+    or from their binary indexes, which are opened without parsing any JSON. Agreements are named
+    as their exports are, e.g. "albania" or "south-korea".
+    """
+    def __init__(self, export_folder, agreements=None, binary=False):
+        self.export_folder = export_folder
+        self.extension = ".index.bin" if binary else ".json"
+        if agreements is None or len(agreements) == 0:
+            agreements = self.list_agreements()
+
+        self.lookups = {}
+        for agreement in agreements:
+            export_filepath = os.path.join(self.export_folder, agreement + self.extension)
+            if not os.path.exists(export_filepath):
+                Error("There is no {extension} export for the agreement '{agreement}' in {export_folder}".format(
+                    extension=self.extension,
+                    agreement=agreement,
+                    export_folder=self.export_folder
+                ), show_additional_information=False)
+            if binary:
+                self.lookups[agreement] = BinaryRuleIndex(export_filepath)
+            else:
+                self.lookups[agreement] = RuleLookup.from_export(export_filepath)
+
+    def list_agreements(self):
+        """ The exports in the export folder of the format being loaded """
+        agreements = []
+        for filename in sorted(os.listdir(self.export_folder)):
+            name = func.get_agreement_name(filename, self.extension)
+            if name is not None:
+                agreements.append(name)
+        return agreements
+
+    def get_agreements(self):
+        return list(self.lookups.keys())
+
+    def get_lookup(self, agreement):
+        """ The lookup for the agreement, or None if the agreement is not loaded """
+        return self.lookups.get(agreement)
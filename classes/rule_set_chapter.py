@@ -1,12 +1,12 @@
 import copy
-import classes.globals as g
 from classes.rule_set_heading import RuleSetHeading
 from classes.rule_set_legacy import RuleSetLegacy
 
 
 class RuleSetChapter(object):
-    def __init__(self, chapter_index, rule_sets):
+    def __init__(self, chapter_index, rule_sets, context):
         self.chapter_index = chapter_index
+        self.context = context
         self.chapter_rule_set_has_ex_code = False
         self.has_ex_codes = False
         self.all_ex_codes = True
@@ -25,7 +25,8 @@ class RuleSetChapter(object):
 
     def get_rule_sets_for_this_chapter(self, rule_sets):
         """
-        Filters the list of rules to just those that belong to this chapter
+        Filters the list of rules to just those that belong to this chapter; the document
+        hands each chapter its own rule sets, so this only picks out the chapter rule sets
         """
         self.rule_sets = []
         self.chapter_rule_sets = []
@@ -64,25 +65,31 @@ class RuleSetChapter(object):
         """
         Get the headings and subheadings from the catalogue for this chapter
         """
-        self.chapter_headings = {}
-        self.chapter_subheadings = {}
-
         chapter_string = str(self.chapter_index).rjust(2, "0")
-        for heading in g.all_headings:
-            if heading[0:2] == chapter_string:
-                self.chapter_headings[heading] = g.all_headings[heading]
+        self.chapter_headings = self.context.tariff_hierarchy.get_chapter_headings(chapter_string)
+        self.chapter_subheadings = self.context.tariff_hierarchy.get_chapter_subheadings(chapter_string)
 
-        for subheading in g.all_subheadings:
-            if subheading[0:2] == chapter_string:
-                self.chapter_subheadings[subheading] = g.all_subheadings[subheading]
+    def index_rule_sets_by_heading(self):
+        """
+        Builds a map from each heading to the rule sets in this chapter that cover it, in their
+        original order, so that each heading can find its rule sets without scanning the chapter
+        """
+        self.rule_sets_by_heading = {}
+        for rule_set in self.rule_sets:
+            for heading in rule_set.headings:
+                heading_rule_sets = self.rule_sets_by_heading.setdefault(heading, [])
+                if len(heading_rule_sets) == 0 or heading_rule_sets[-1] is not rule_set:
+                    heading_rule_sets.append(rule_set)
 
     def process_headings(self):
         """
         Process all headings in this chapter
         """
+        self.index_rule_sets_by_heading()
+        whole_chapter_rules = self.chapter_rule_sets
         self.chapter_rule_sets = []
         for chapter_heading in self.chapter_headings:
-            rule_set_heading = RuleSetHeading(chapter_heading, self.rule_sets)
+            rule_set_heading = RuleSetHeading(chapter_heading, self.rule_sets_by_heading.get(chapter_heading, []), whole_chapter_rules, self.context)
             self.chapter_rule_sets += rule_set_heading.heading_rule_sets
         
     def merge_contiguous_identical_rules(self):
@@ -116,7 +123,7 @@ class RuleSetChapter(object):
             self.chapter_rule_sets.sort(key=lambda x: x.heading, reverse=False)
             pre_sorted = True
 
-        next_rule_set = RuleSetLegacy(None, None, None)
+        next_rule_set = RuleSetLegacy(None, None, None, self.context)
         for index in range(rule_set_count - 1, -1, -1):
             current_rule_set = self.chapter_rule_sets[index]
             if current_rule_set.is_heading:
@@ -1,20 +1,19 @@
 import copy
-import classes.globals as g
+from classes.residual_rule_set import ResidualRuleSet
 
 
 class RuleSetHeadingWithSubHeadings(object):
-    def __init__(self, heading, rule_sets, whole_chapter_rules):
+    def __init__(self, heading, rule_sets, whole_chapter_rules, context):
+        self.context = context
         self.heading = heading
         self.whole_chapter_rules = whole_chapter_rules
         self.heading_ex_code_rule_set = None
         self.heading_rule_sets = []
         self.get_catalogue_headings_subheadings_for_heading()
 
-        # Get the rule sets that apply to this heading
-        self.rule_sets = []
-        for my_set in rule_sets:
-            if self.heading in my_set.headings:
-                self.rule_sets.append(my_set)
+        # The rule sets that apply to this heading
+        self.rule_sets = rule_sets
+        self.index_rule_sets_by_subheading()
 
         self.check_ex_code_at_heading_level()
         self.find_matching_rule_sets()
@@ -25,29 +24,39 @@ class RuleSetHeadingWithSubHeadings(object):
                 self.heading_ex_code_rule_set = copy.copy(rule_set)
                 break
 
+    def index_rule_sets_by_subheading(self):
+        """
+        Builds a map from each subheading to the rule sets that cover it, in their original order
+        """
+        self.rule_sets_by_subheading = {}
+        for rule_set in self.rule_sets:
+            for subheading in rule_set.subheadings:
+                subheading_rule_sets = self.rule_sets_by_subheading.setdefault(subheading, [])
+                if len(subheading_rule_sets) == 0 or subheading_rule_sets[-1] is not rule_set:
+                    subheading_rule_sets.append(rule_set)
+
     def find_matching_rule_sets(self):
         """
         Words go here
         """
         whole_chapter_rules_inserted = False
         for subheading in self.heading_subheadings:
-            for rule_set in self.rule_sets:
-                if subheading in rule_set.subheadings:
-                    self.heading_rule_sets.append(rule_set)
-                    rule_set.added_to_heading = True
-                    if rule_set.is_ex_code:
+            for rule_set in self.rule_sets_by_subheading.get(subheading, []):
+                self.heading_rule_sets.append(rule_set)
+                rule_set.added_to_heading = True
+                if rule_set.is_ex_code:
+                    if len(self.whole_chapter_rules) > 0:
+                        if not whole_chapter_rules_inserted:
+                            residual_rules = self.copy_rule(self.whole_chapter_rules, subheading[0:4])
+                            self.heading_rule_sets += residual_rules
+                            whole_chapter_rules_inserted = True
+                else:
+                    if self.heading_ex_code_rule_set is None:
                         if len(self.whole_chapter_rules) > 0:
                             if not whole_chapter_rules_inserted:
                                 residual_rules = self.copy_rule(self.whole_chapter_rules, subheading[0:4])
                                 self.heading_rule_sets += residual_rules
                                 whole_chapter_rules_inserted = True
-                    else:
-                        if self.heading_ex_code_rule_set is None:
-                            if len(self.whole_chapter_rules) > 0:
-                                if not whole_chapter_rules_inserted:
-                                    residual_rules = self.copy_rule(self.whole_chapter_rules, subheading[0:4])
-                                    self.heading_rule_sets += residual_rules
-                                    whole_chapter_rules_inserted = True
 
         for rule_set in self.rule_sets:
             if not rule_set.added_to_heading:
@@ -56,7 +65,7 @@ class RuleSetHeadingWithSubHeadings(object):
     def copy_rule(self, rule_sets, subheading):
         ret = []
         for rule_set in rule_sets:
-            obj = copy.copy(rule_set)
+            obj = ResidualRuleSet(rule_set)
             obj.min = subheading + "0" * (10 - len(subheading))
             obj.max = subheading + "9" * (10 - len(subheading))
             obj.subdivision = "Any other product from heading {heading}".format(
@@ -72,10 +81,6 @@ class RuleSetHeadingWithSubHeadings(object):
 
     def get_catalogue_headings_subheadings_for_heading(self):
         """
-        Get the headings and subheadings from the catalogue for this chapter
+        Get the subheadings from the catalogue for this heading
         """
-        self.heading_subheadings = {}
-
-        for subheading in g.all_subheadings:
-            if subheading[0:4] == self.heading:
-                self.heading_subheadings[subheading] = g.all_subheadings[subheading]
+        self.heading_subheadings = self.context.tariff_hierarchy.get_heading_subheadings(self.heading)
@@ -1,21 +1,34 @@
 import re
-import json
-import os
 
-from classes.normalizer import Normalizer
-from classes.rule import Rule
+from classes.normalizer import cell_normalize
+from classes.rule_cache import get_rule_cache
 from classes.error import Error
 import classes.globals as g
 
 
 class RuleSetLegacy(object):
-    def __init__(self, row, row_index, footnotes_lookup):
+    # Rule sets are created for every row of the table and copied for every heading that a
+    # chapter-level rule applies to, so they keep their attributes in slots rather than a dict
+    __slots__ = (
+        "context", "row_index", "hierarchy_divider", "heading", "footnotes_lookup", "subdivision",
+        "subdivision_original", "description", "rule", "is_ex_code", "parts", "rules",
+        "is_subdivision", "min", "max", "valid", "chapter", "headings", "subheadings",
+        "mixes_ex_and_non_ex", "contains_non_contiguous_and", "multiple_ands",
+        "possible_missing_hyphens", "added_to_heading", "sort_index",
+        "subdivision_adoption_requirement", "is_chapter", "is_heading", "is_subheading", "is_range",
+        "original_heading", "original_rule", "original_rule2", "mark_for_deletion",
+    )
+
+    def __init__(self, row, row_index, footnotes_lookup, context):
+        self.context = context
         self.row_index = row_index
         self.hierarchy_divider = " ➔ "
         self.hierarchy_divider = " ▸ "
         self.heading = ""
         self.footnotes_lookup = footnotes_lookup
         self.subdivision = ""
+        self.subdivision_original = ""
+        self.description = ""
         self.rule = ""
         self.is_ex_code = False
         self.parts = []
@@ -37,6 +50,7 @@ class RuleSetLegacy(object):
 
         self.headings = []
         self.subheadings = []
+        self.is_chapter = False
         self.is_heading = False
         self.is_subheading = False
         self.is_range = False
@@ -48,7 +62,6 @@ class RuleSetLegacy(object):
         if row is not None:
             # A rule set essentially equates to a row on the table
             self.original_heading = row["original_heading"].strip()
-            self.description = ""
             self.subdivision = row["description"].strip()
             self.original_rule = row["original_rule"].strip()
             self.original_rule = self.original_rule.replace("Manufacture;", "Manufacture:")
@@ -74,6 +87,46 @@ class RuleSetLegacy(object):
             self.capture_parent_description()
             self.set_valid_status()
 
+    def __copy__(self):
+        """ A shallow copy, the same as copy.copy would make, but without going through the
+        generic copy protocol, which is slow for objects with slots """
+        duplicate = RuleSetLegacy.__new__(RuleSetLegacy)
+        duplicate.context = self.context
+        duplicate.row_index = self.row_index
+        duplicate.hierarchy_divider = self.hierarchy_divider
+        duplicate.heading = self.heading
+        duplicate.footnotes_lookup = self.footnotes_lookup
+        duplicate.subdivision = self.subdivision
+        duplicate.subdivision_original = self.subdivision_original
+        duplicate.description = self.description
+        duplicate.rule = self.rule
+        duplicate.is_ex_code = self.is_ex_code
+        duplicate.parts = self.parts
+        duplicate.rules = self.rules
+        duplicate.is_subdivision = self.is_subdivision
+        duplicate.min = self.min
+        duplicate.max = self.max
+        duplicate.valid = self.valid
+        duplicate.chapter = self.chapter
+        duplicate.headings = self.headings
+        duplicate.subheadings = self.subheadings
+        duplicate.mixes_ex_and_non_ex = self.mixes_ex_and_non_ex
+        duplicate.contains_non_contiguous_and = self.contains_non_contiguous_and
+        duplicate.multiple_ands = self.multiple_ands
+        duplicate.possible_missing_hyphens = self.possible_missing_hyphens
+        duplicate.added_to_heading = self.added_to_heading
+        duplicate.sort_index = self.sort_index
+        duplicate.subdivision_adoption_requirement = self.subdivision_adoption_requirement
+        duplicate.is_chapter = self.is_chapter
+        duplicate.is_heading = self.is_heading
+        duplicate.is_subheading = self.is_subheading
+        duplicate.is_range = self.is_range
+        duplicate.original_heading = self.original_heading
+        duplicate.original_rule = self.original_rule
+        duplicate.original_rule2 = self.original_rule2
+        duplicate.mark_for_deletion = self.mark_for_deletion
+        return duplicate
+
     def standarise_hyphens(self, s):
         s = s.replace("–", "-")  # en-dash
         s = s.replace("—", "-")  # em-dash
@@ -96,7 +149,7 @@ class RuleSetLegacy(object):
         if self.original_rule == "As specified for split headings":
             self.original_rule = ""
         if self.original_rule == "" or self.original_rule == "-":
-            g.parent_heading = self.subdivision
+            self.context.parent_heading = self.subdivision
 
     def set_valid_status(self):
         for rule in self.rules:
@@ -180,10 +233,9 @@ class RuleSetLegacy(object):
                 if or_count == 0 and however_count == 0:
                     if (hyphen_count + 1) < newline_count:
                         self.possible_missing_hyphens = True
-                        g.possible_missing_hyphens.append(self.original_heading)
+                        self.context.possible_missing_hyphens.append(self.original_heading)
 
-        n = Normalizer()
-        self.heading = n.normalize(self.original_heading)
+        self.heading = cell_normalize(self.original_heading)
 
         self.heading = self.heading.replace(".", "")
         self.heading = self.heading.replace(" - ", "-")
@@ -192,13 +244,13 @@ class RuleSetLegacy(object):
         self.get_heading_class()
 
         if self.mixes_ex_and_non_ex:
-            g.mix_ex_non_ex_errors.append(self.original_heading)
+            self.context.mix_ex_non_ex_errors.append(self.original_heading)
 
         elif self.contains_non_contiguous_and:
-            g.non_contiguous_and_errors.append(self.original_heading)
+            self.context.non_contiguous_and_errors.append(self.original_heading)
 
         elif self.multiple_ands:
-            g.multiple_and_errors.append(self.original_heading)
+            self.context.multiple_and_errors.append(self.original_heading)
 
         else:
             if "-" in self.original_heading or " to " in self.original_heading:
@@ -310,29 +362,11 @@ class RuleSetLegacy(object):
         if self.is_heading:
             # Work out the headings that this rule_set covers
             self.headings.append(parts[0].strip())
-            tmp_min = int(parts[0])
-            tmp_max = int(parts[1])
-            proceed = True
-            while proceed:
-                tmp_min += 1
-                str_min = str(tmp_min).rjust(4, "0").strip()
-                if str_min in g.all_headings:
-                    self.headings.append(str_min)
-                if tmp_min == tmp_max:
-                    proceed = False
+            self.headings += self.context.tariff_hierarchy.get_headings_in_range(int(parts[0]), int(parts[1]))
         elif self.is_subheading:
             # Work out the subheadings that this rule_set covers
             self.subheadings.append(parts[0])
-            tmp_min = int(parts[0])
-            tmp_max = int(parts[1])
-            proceed = True
-            while proceed:
-                tmp_min += 1
-                str_min = str(tmp_min).rjust(6, "0")
-                if str_min in g.all_subheadings:
-                    self.subheadings.append(str_min)
-                if tmp_min == tmp_max:
-                    proceed = False
+            self.subheadings += self.context.tariff_hierarchy.get_subheadings_in_range(int(parts[0]), int(parts[1]))
 
     def process_subdivision(self):
         self.subdivision = self.subdivision.replace("except for;", "except for:")
@@ -343,11 +377,7 @@ class RuleSetLegacy(object):
         self.subdivision = self.subdivision.replace("\n<b>", "<br><b>")
 
         # Run the corrections
-        corrections_file = os.path.join(os.getcwd(), "resources", "data", "corrections.json")
-        f = open(corrections_file)
-        corrections = json.load(f)
-        for correction in corrections:
-            self.subdivision = self.subdivision.replace(correction["from"], correction["to"])
+        self.subdivision = self.context.corrections.apply(self.subdivision)
 
 
         # Standardise different hyphen characters
@@ -356,8 +386,7 @@ class RuleSetLegacy(object):
         self.subdivision = self.subdivision.replace("  ", " ")
 
         # Normalise additional characters
-        n = Normalizer()
-        self.subdivision = n.normalize(self.subdivision).strip()
+        self.subdivision = cell_normalize(self.subdivision).strip()
         self.subdivision = self.subdivision.replace(" %", "%")
         self.subdivision = self.subdivision.replace("ex ex", "ex ")
 
@@ -396,8 +425,7 @@ class RuleSetLegacy(object):
         self.original_rule = self.original_rule.replace("from :", "from:")
 
     def process_rule(self):
-        n = Normalizer()
-        self.original_rule = n.normalize(self.original_rule)
+        self.original_rule = cell_normalize(self.original_rule)
         self.original_rule = re.sub("\t", " ", self.original_rule)
         self.original_rule = re.sub(" +", " ", self.original_rule)
         self.original_rule = self.original_rule.replace("ex ex", "ex ")
@@ -426,11 +454,10 @@ class RuleSetLegacy(object):
         
         # Check on "Manufacture" appearing more than once:
         if self.original_rule.count("Manufacture") > 1 and len(rule_strings) == 1:
-            g.multiple_manufacture.append(self.heading)
+            self.context.multiple_manufacture.append(self.heading)
 
         for rule_string in rule_strings:
-            rule = Rule(rule_string, self.heading)
-            self.rules.append(rule.as_dict())
+            self.rules.append(get_rule_cache().get_rule(rule_string, self.heading, self.context))
 
     def as_dict(self):
         my_dictionary = {
@@ -1,12 +1,13 @@
 import re
 import sys
 
-from classes.normalizer import Normalizer
-from classes.rule import Rule
+from classes.normalizer import cell_normalize
+from classes.rule_cache import get_rule_cache
 
 
 class RuleSetModern(object):
-    def __init__(self, row):
+    def __init__(self, row, context):
+        self.context = context
         # A rule set essentially equates to a row on the table
         self.original_heading = row["original_heading"].strip()
         try:
@@ -37,8 +38,7 @@ class RuleSetModern(object):
                 break
 
     def process_heading(self):
-        n = Normalizer()
-        self.heading = n.normalize(self.original_heading)
+        self.heading = cell_normalize(self.original_heading)
         self.heading = self.heading.replace(".", "")
         self.heading = self.heading.replace(" - ", "-")
         self.heading = re.sub("([0-9]) to ([0-9])", "\\1 - \\2", self.heading)
@@ -78,8 +78,7 @@ class RuleSetModern(object):
             index += 1
 
     def process_rule(self):
-        n = Normalizer()
-        self.original_rule = n.normalize(self.original_rule)
+        self.original_rule = cell_normalize(self.original_rule)
         self.rules = []
         self.original_rule = self.original_rule.strip(";")
         self.original_rule = self.original_rule.replace("; and", ", and")
@@ -88,8 +87,7 @@ class RuleSetModern(object):
         self.rule_strings = self.original_rule.split(";")
 
         for rule_string in self.rule_strings:
-            rule = Rule(rule_string, self.original_heading)
-            self.rules.append(rule.as_dict())
+            self.rules.append(get_rule_cache().get_rule(rule_string, self.original_heading, self.context))
 
     def as_dict(self):
         s = {
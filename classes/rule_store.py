@@ -0,0 +1,136 @@
+import os
+import copy
+import json
+import hashlib
+
+from classes.export_formats import publish_export_files
+from classes.error import Error
+
+RULE_STORE_FILENAME = "rule-store.json"
+RULE_HASH_LENGTH = 16
+
+
+class RuleStore(object):
+    """
+    A single store of every distinct rule across all of the agreements, keyed by a hash of the
+    rule's content. Many agreements share the same rules (those based on the Pan-Euro-Med rules
+    in particular), so each rule is held once in the store and each agreement's rule_store export
+    refers to its rules by their hashes:
+
+    - rule-store.json: {"rules": {hash: rule, ...}}, in hash order
+    - <scheme>.rule_store.json: the rule sets as in the standard export, except that rules is a
+      list of hashes, e.g. "rules": ["5c1b8e0f3a2d4e61"]
+
+    A rule's hash is the first 16 hex digits of the SHA-256 of its canonical JSON (sorted keys,
+    no whitespace), so the same rule has the same hash in every build and every agreement, and a
+    frontend can cache rules across agreements by hash.
+    """
+    def __init__(self):
+        self.rules = {}
+        self.agreements = {}
+        self.reference_count = 0
+        self.export_size = 0
+        self.published_size = 0
+
+    @staticmethod
+    def get_rule_hash(rule):
+        canonical = json.dumps(rule, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[0:RULE_HASH_LENGTH]
+
+    def add_export(self, export_filename, export_filepath):
+        """ Adds the rules of an agreement's standard export to the store, and returns the
+        agreement's rule_store export """
+        with open(export_filepath, "rb") as f:
+            content = f.read()
+        self.export_size += len(content)
+
+        rule_sets = []
+        agreement_hashes = set()
+        for rule_set in json.loads(content)["rule_sets"]:
+            store_rule_set = dict(rule_set)
+            store_rule_set["rules"] = []
+            for rule in rule_set["rules"]:
+                rule_hash = self.get_rule_hash(rule)
+                stored_rule = self.rules.setdefault(rule_hash, rule)
+                if stored_rule != rule:
+                    Error("Rules {first!r} and {second!r} have the same hash".format(first=stored_rule, second=rule), show_additional_information=False)
+                store_rule_set["rules"].append(rule_hash)
+                agreement_hashes.add(rule_hash)
+                self.reference_count += 1
+            rule_sets.append(store_rule_set)
+
+        self.agreements[export_filename] = agreement_hashes
+        return json.dumps({"rule_sets": rule_sets}, separators=(",", ":")).encode("utf-8")
+
+    def serialize(self):
+        rules = {rule_hash: self.rules[rule_hash] for rule_hash in sorted(self.rules)}
+        return json.dumps({"rules": rules}, separators=(",", ":")).encode("utf-8")
+
+    def get_stats(self):
+        """ How much the agreements share: the rules they would hold between them if each kept its
+        own distinct rules, against the rules in the store, and the rules used by more than one """
+        agreement_counts = {}
+        for agreement_hashes in self.agreements.values():
+            for rule_hash in agreement_hashes:
+                agreement_counts[rule_hash] = agreement_counts.get(rule_hash, 0) + 1
+        return {
+            "agreements": len(self.agreements),
+            "references": self.reference_count,
+            "agreement_rules": sum(len(agreement_hashes) for agreement_hashes in self.agreements.values()),
+            "distinct_rules": len(self.rules),
+            "shared_rules": len([count for count in agreement_counts.values() if count > 1]),
+            "export_size": self.export_size,
+            "published_size": self.published_size
+        }
+
+    @staticmethod
+    def format_stats(stats):
+        agreement_rules = stats["agreement_rules"]
+        saving = 100 * (agreement_rules - stats["distinct_rules"]) / agreement_rules if agreement_rules > 0 else 0
+        lines = [
+            "Rule store: {distinct_rules} distinct rules from {references} rule references in {agreements} agreements".format(
+                distinct_rules=stats["distinct_rules"],
+                references=stats["references"],
+                agreements=stats["agreements"]
+            ),
+            "- {shared_rules} rules are used by more than one agreement".format(shared_rules=stats["shared_rules"]),
+            "- The agreements hold {agreement_rules} distinct rules between them; the store holds {saving:.1f}% fewer".format(
+                agreement_rules=agreement_rules,
+                saving=saving
+            ),
+            "- {published_size:.1f} MB published, against {export_size:.1f} MB of standard exports".format(
+                published_size=stats["published_size"] / (1024 * 1024),
+                export_size=stats["export_size"] / (1024 * 1024)
+            )
+        ]
+        return "\n".join(lines)
+
+
+def publish_rule_store(export_filenames, export_formats, export_folder, ott_prototype_path):
+    """ Builds the rule store from the standard exports of the agreements, and publishes it and
+    each agreement's rule_store export alongside the other exports """
+    rule_store = RuleStore()
+    for export_filename in export_filenames:
+        export_filepath = os.path.join(export_folder, export_filename + ".json")
+        if not os.path.exists(export_filepath):
+            continue
+        content = rule_store.add_export(export_filename, export_filepath)
+        rule_store.published_size += len(content)
+        publish_export_files(export_formats.compress([(export_filename + ".rule_store.json", content)]), export_folder, ott_prototype_path)
+
+    content = rule_store.serialize()
+    rule_store.published_size += len(content)
+    publish_export_files(export_formats.compress([(RULE_STORE_FILENAME, content)]), export_folder, ott_prototype_path)
+    return rule_store
+
+
+def expand_rule_store(document, store):
+    """ Turns an agreement's rule_store export, and the rule store (both as loaded from JSON),
+    back into the standard structure """
+    rules = store["rules"]
+    rule_sets = []
+    for store_rule_set in document["rule_sets"]:
+        rule_set = dict(store_rule_set)
+        rule_set["rules"] = [copy.deepcopy(rules[rule_hash]) for rule_hash in store_rule_set["rules"]]
+        rule_sets.append(rule_set)
+    return {"rule_sets": rule_sets}
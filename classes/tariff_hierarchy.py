@@ -0,0 +1,62 @@
+import bisect
+
+
+class TariffHierarchy(object):
+    """
+    The commodity code list arranged as a tree of chapter, heading, subheading and leaf codes,
+    so that the headings in a chapter, the subheadings in a heading and the leaf codes in a
+    subheading can each be looked up directly rather than searched for.
+
+    Headings and subheadings keep the order (and the descriptions) of the code list. They are
+    also held in numeric order, so that the headings or subheadings within a range of codes can
+    be found with a binary search. Like the rest of the reference data, the hierarchy is shared
+    between documents and is read-only.
+    """
+    def __init__(self, all_headings, all_subheadings, all_leaf_codes):
+        self.headings_by_chapter = {}
+        for heading in all_headings:
+            self.headings_by_chapter.setdefault(heading[0:2], {})[heading] = all_headings[heading]
+
+        self.subheadings_by_chapter = {}
+        self.subheadings_by_heading = {}
+        for subheading in all_subheadings:
+            self.subheadings_by_chapter.setdefault(subheading[0:2], {})[subheading] = all_subheadings[subheading]
+            self.subheadings_by_heading.setdefault(subheading[0:4], {})[subheading] = all_subheadings[subheading]
+
+        self.heading_numbers, self.heading_codes = self.sort_numerically(all_headings)
+        self.subheading_numbers, self.subheading_codes = self.sort_numerically(all_subheadings)
+
+        self.leaf_codes_by_subheading = {}
+        for leaf_code in all_leaf_codes:
+            self.leaf_codes_by_subheading.setdefault(leaf_code[0:6], []).append(leaf_code)
+
+    @staticmethod
+    def sort_numerically(codes):
+        """ Returns the numeric values of the codes, in order, alongside the codes themselves """
+        numbered = sorted((int(code), code) for code in codes if code.isdigit())
+        return [number for number, code in numbered], [code for number, code in numbered]
+
+    @staticmethod
+    def get_codes_in_range(numbers, codes, after, last):
+        """ The codes whose numeric value is greater than after, up to and including last """
+        start = bisect.bisect_right(numbers, after)
+        end = bisect.bisect_right(numbers, last)
+        return codes[start:end]
+
+    def get_headings_in_range(self, after, last):
+        return self.get_codes_in_range(self.heading_numbers, self.heading_codes, after, last)
+
+    def get_subheadings_in_range(self, after, last):
+        return self.get_codes_in_range(self.subheading_numbers, self.subheading_codes, after, last)
+
+    def get_chapter_headings(self, chapter_string):
+        return self.headings_by_chapter.get(chapter_string, {})
+
+    def get_chapter_subheadings(self, chapter_string):
+        return self.subheadings_by_chapter.get(chapter_string, {})
+
+    def get_heading_subheadings(self, heading):
+        return self.subheadings_by_heading.get(heading, {})
+
+    def get_subheading_leaf_codes(self, subheading):
+        return self.leaf_codes_by_subheading.get(subheading, [])
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import argparse
+
+from classes.rule_lookup import AgreementLookup, RuleLookup
+from classes.bulk_lookup import BulkLookup, BULK_FORMATS, HEADER_OPTIONS, read_codes
+from classes.lookup_server import LookupServer
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description="Look up the rule sets that apply to commodity codes under an agreement")
+    parser.add_argument("--export-folder", default=os.path.join(os.getcwd(), "resources", "export"), help="the folder holding the exports")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    find = commands.add_parser("find", help="print the rule sets that apply to each code")
+    find.add_argument("agreement", help="the agreement, named as its export is, e.g. albania")
+    find.add_argument("codes", nargs="+", help="commodity codes of up to 10 digits")
+    find.add_argument("--binary", action="store_true", help="read the binary index rather than the JSON export")
+
+    bulk = commands.add_parser("bulk", help="look up every code in a CSV file in one pass")
+    bulk.add_argument("agreement", help="the agreement, named as its export is, e.g. albania")
+    bulk.add_argument("input", help="a CSV file of commodity codes, or - to read from standard input")
+    bulk.add_argument("--column", help="the column holding the codes, as a 0-based index or a header name (the first column if omitted)")
+    bulk.add_argument("--header", choices=HEADER_OPTIONS, default="auto", help="whether the first row is a header; auto takes it to be one if it is not a code (ignored when --column is a name)")
+    bulk.add_argument("--format", choices=BULK_FORMATS, default="ndjson", help="the output format")
+    bulk.add_argument("--output", default="-", help="the file to write the results to, or - for standard output")
+    bulk.add_argument("--binary", action="store_true", help="read the binary index rather than the JSON export")
+
+    serve = commands.add_parser("serve", help="answer lookups over HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--quiet", action="store_true", help="do not log each request")
+    serve.add_argument("--binary", action="store_true", help="read the binary indexes rather than the JSON exports")
+    serve.add_argument("agreements", nargs="*", help="the agreements to load (all of them if omitted)")
+    return parser.parse_args()
+
+
+def find(arguments):
+    lookup = AgreementLookup(arguments.export_folder, [arguments.agreement], binary=arguments.binary).get_lookup(arguments.agreement)
+    results = []
+    for code in arguments.codes:
+        normalized_code = RuleLookup.normalize_code(code)
+        if normalized_code is None:
+            print("ERROR: {code} is not a commodity code".format(code=code))
+            sys.exit(1)
+        results.append({"code": normalized_code, "rule_sets": lookup.find(normalized_code)})
+    print(json.dumps(results, indent=4))
+
+
+def bulk(arguments):
+    lookup = AgreementLookup(arguments.export_folder, [arguments.agreement], binary=arguments.binary).get_lookup(arguments.agreement)
+    input_file = sys.stdin if arguments.input == "-" else open(arguments.input, newline="")
+    output_file = sys.stdout.buffer if arguments.output == "-" else open(arguments.output, "wb")
+    try:
+        codes = read_codes(input_file, arguments.column, arguments.header)
+        for chunk in BulkLookup(lookup).iter_format(codes, arguments.format):
+            output_file.write(chunk)
+    except ValueError as e:
+        print("ERROR: {error}".format(error=e))
+        sys.exit(1)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout.buffer:
+            output_file.close()
+
+
+def serve(arguments):
+    agreement_lookup = AgreementLookup(arguments.export_folder, arguments.agreements, binary=arguments.binary)
+    server = LookupServer((arguments.host, arguments.port), agreement_lookup, quiet=arguments.quiet)
+    print("Serving lookups for {count} agreements on http://{host}:{port}/lookup?agreement=...&code=...".format(
+        count=len(agreement_lookup.get_agreements()),
+        host=arguments.host,
+        port=server.server_address[1]
+    ))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == "__main__":
+    arguments = get_arguments()
+    if arguments.command == "find":
+        find(arguments)
+    elif arguments.command == "bulk":
+        bulk(arguments)
+    else:
+        serve(arguments)
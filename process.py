@@ -1,6 +1,8 @@
 from classes.roo_document import RooDocument
+from classes.rule_cache import get_rule_cache, RuleCache
 import classes.globals as g
 
 
 g.clear()
 document = RooDocument()
+print(RuleCache.format_stats(get_rule_cache().get_stats()))